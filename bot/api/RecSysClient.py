@@ -24,11 +24,15 @@ class RecSysClient(BaseApiClient):
     async def get_recommendations(
             self,
             user_id: int,
-            count: int = 30
+            count: int = 5,
+            cursor: Optional[str] = None
     ) -> Optional[GetRecommendationsResponse]:
+        params = {"count": count}
+        if cursor:
+            params["cursor"] = cursor
         resp = await self.client.get(
             "/recsys/users/recommendations",
-            params={"count": count},
+            params=params,
             headers=self._headers(user_id)
         )
         return await self._handle_response(resp, GetRecommendationsResponse)
\ No newline at end of file
@@ -12,6 +12,7 @@ from keyboards.main import get_main_keyboard
 from keyboards.back import get_back_keyboard
 from states.message import Message
 from models.api.swipe.requests import AddSwipeRequest
+from models.api.recsys.responses import RecommendationItem
 from exceptions.rate_limit_error import RateLimitError
 
 router = CustomRouter()
@@ -24,27 +25,31 @@ async def send_next_recommendation(user_id: int, message: types.Message, state:
     try:
         is_active = await is_profile_active(profile_client, message.from_user.id)
 
-        try:
-            response = await recsys_client.get_recommendations(user_id)
-        except RateLimitError:
-            await message.answer(_("rate_limit_error_try_later"))
-            return
-        except Exception as e:
-            await message.answer(_("recommendations_load_error"))
-            return
-
-        recs = response.recommendations if response else []
-
-        if not recs:
-            await message.answer(_("no_more_recommendations"), reply_markup=get_main_keyboard(is_active, _))
-            return
+        data = await state.get_data()
+        recs = [RecommendationItem(**rec) for rec in data.get("feed_recs", [])]
+        cursor = data.get("feed_cursor")
 
         while True:
             if not recs:
-                await message.answer(_("no_more_recommendations"), reply_markup=get_main_keyboard(is_active, _))
-                return
-
-            recommendation = recs.pop()
+                try:
+                    response = await recsys_client.get_recommendations(user_id, cursor=cursor)
+                except RateLimitError:
+                    await message.answer(_("rate_limit_error_try_later"))
+                    return
+                except Exception as e:
+                    await message.answer(_("recommendations_load_error"))
+                    return
+
+                recs = list(response.recommendations) if response else []
+                cursor = response.next_cursor if response else None
+
+                if not recs:
+                    await state.update_data(feed_recs=[], feed_cursor=None)
+                    await message.answer(_("no_more_recommendations"), reply_markup=get_main_keyboard(is_active, _))
+                    return
+
+            recommendation = recs.pop(0)
+            await state.update_data(feed_recs=[rec.model_dump() for rec in recs], feed_cursor=cursor)
             next_user_id = recommendation.user_id
             distance = recommendation.distance
 
@@ -174,7 +179,7 @@ async def handle_question_input(message: types.Message, state: FSMContext, _: Ca
         swipe_data=swipe_request
     )
 
-    await state.clear()
+    await state.set_state(None)
     await message.answer(_("question_sent"))
     await send_next_recommendation(from_user_id, message, state, _)
 
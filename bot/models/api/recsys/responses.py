@@ -1,5 +1,5 @@
 from pydantic import BaseModel
-from typing import List
+from typing import List, Optional
 
 class RecommendationItem(BaseModel):
     user_id: int
@@ -7,3 +7,4 @@ class RecommendationItem(BaseModel):
 
 class GetRecommendationsResponse(BaseModel):
     recommendations: List[RecommendationItem]
+    next_cursor: Optional[str] = None
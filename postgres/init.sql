@@ -36,6 +36,8 @@ CREATE TABLE IF NOT EXISTS profiles (
     about TEXT,
     is_active BOOLEAN DEFAULT TRUE,
     about_embedding DOUBLE PRECISION[],
+    about_embedding_packed BYTEA,
+    about_embedding_updated_at TIMESTAMPTZ,
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
     location geography(Point, 4326)
 );
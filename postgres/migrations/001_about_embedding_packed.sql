@@ -0,0 +1 @@
+ALTER TABLE profiles ADD COLUMN IF NOT EXISTS about_embedding_packed BYTEA;
@@ -1,4 +1,5 @@
 from fastapi import APIRouter, Request, Depends, Query
+from typing import Optional
 from dependency_injector.wiring import inject, Provide
 from slowapi import Limiter
 
@@ -20,9 +21,10 @@ limiter = Limiter(
     response_model=GetRecommendationsResponse,
     tags=["Recommendations"],
     summary="Get user recommendations",
-    description="Return a list of recommended users based on the requesting user's profile.",
+    description="Return a page of recommended users based on the requesting user's profile. Pass `next_cursor` back as `cursor` to fetch the following page.",
     responses={
         200: {"description": "Recommendations retrieved"},
+        400: {"description": "Invalid cursor"},
         429: {"description": "Rate limit exceeded"},
     },
 )
@@ -30,8 +32,12 @@ limiter = Limiter(
 @limiter.limit("10/minute")
 async def get_recommendations(
     request: Request,
-    count: int = Query(..., description="Number of recommendations to retrieve."),
+    count: int = Query(
+        10, ge=1, le=Container.config().RECSYS_MAX_PAGE_SIZE,
+        description="Number of recommendations to retrieve."
+    ),
+    cursor: Optional[str] = Query(None, description="Cursor returned by the previous page."),
     user_id: int = Depends(get_user_id_from_headers),
     recommendation_service: RecommendationService = Depends(Provide[Container.services.provided.recommendation])
 ):
-    return await recommendation_service.get_recommendations(user_id, count)
+    return await recommendation_service.get_recommendations(user_id, count, cursor)
@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field
-from typing import List
+from typing import List, Optional
 
 class RecommendationItem(BaseModel):
     user_id: int = Field(..., description="ID of the recommended user")
@@ -9,6 +9,9 @@ class GetRecommendationsResponse(BaseModel):
     recommendations: List[RecommendationItem] = Field(
         ..., description="List of recommended users"
     )
+    next_cursor: Optional[str] = Field(
+        None, description="Opaque cursor to pass back to fetch the next page"
+    )
 
     model_config = {
         "json_schema_extra": {
@@ -17,7 +20,8 @@ class GetRecommendationsResponse(BaseModel):
                     {"user_id": 101, "distance": 2.5},
                     {"user_id": 205, "distance": 7.8},
                     {"user_id": 309, "distance": 12.0}
-                ]
+                ],
+                "next_cursor": "cmVjczoxMg"
             }
         }
     }
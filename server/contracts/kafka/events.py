@@ -17,3 +17,6 @@ class SwipeEvent(BaseModel):
     to_user_id: int
     action: Literal['like', 'question']
     message: Optional[str] = None
+
+class ProfileTextChangedEvent(BaseModel):
+    user_id: int
@@ -1,6 +1,6 @@
 from pydantic_settings import BaseSettings
 from pydantic import RedisDsn, PostgresDsn, Field
-from typing import List
+from typing import List, Literal, Optional
 from functools import lru_cache
 
 class Settings(BaseSettings):
@@ -24,6 +24,11 @@ class Settings(BaseSettings):
     KAFKA_VIDEO_TOPIC: str
     KAFKA_GEO_NOTIFICATIONS_TOPIC: str
     KAFKA_VIDEO_NOTIFICATIONS_TOPIC: str
+    KAFKA_PROFILE_TEXT_TOPIC: str = "profile_text_changed"
+    KAFKA_EMBEDDING_CONSUMER_GROUP: str = "embedding-workers"
+    KAFKA_EMBEDDING_CONSUMER_CONCURRENCY: int = 32
+    KAFKA_EMBEDDING_CONSUMER_RETRIES: int = 3
+    KAFKA_PROFILE_TEXT_DLQ_TOPIC: str = "profile_text_changed.dlq"
     
     S3_ENDPOINT_URL: str
     S3_REGION_NAME: str
@@ -39,6 +44,77 @@ class Settings(BaseSettings):
 
     API_SECRET_KEY: str
 
+    EMBEDDING_STORAGE: Literal["array", "float32", "int8"] = "float32"
+
+    EMBEDDING_MODEL_NAME: str = "all-MiniLM-L6-v2"
+    EMBEDDING_BACKEND: Literal["torch", "onnx", "onnx-int8"] = "torch"
+    EMBEDDING_ONNX_FILE: Optional[str] = None
+    EMBEDDING_PRELOAD: bool = True
+    EMBEDDING_INFERENCE_WORKERS: int = 1
+    EMBEDDING_INFERENCE_QUEUE_SIZE: int = 256
+    EMBEDDING_INFERENCE_THREADS: Optional[int] = None
+    EMBEDDING_BATCH_MAX_SIZE: int = 32
+    EMBEDDING_BATCH_MAX_WAIT_MS: int = 10
+
+    RECSYS_MAX_PAGE_SIZE: int = 50
+    RECSYS_QUEUE_SIZE: int = 100
+    RECSYS_QUEUE_LOW_WATERMARK: int = 20
+    RECSYS_REFILL_CONCURRENCY: int = 4
+    RECSYS_COMPUTE_LOCK_TTL: int = 10
+    RECSYS_EMBEDDING_SOURCE_TIMEOUT_MS: int = 500
+    RECSYS_RANDOM_SOURCE_TIMEOUT_MS: int = 300
+
+    RECSYS_ANN_INDEX_ENABLED: bool = True
+    RECSYS_ANN_INDEX_LISTS: int = 64
+    RECSYS_ANN_INDEX_PROBES: int = 8
+    RECSYS_ANN_INDEX_REFRESH_INTERVAL: int = 60 * 10
+    RECSYS_ANN_INDEX_CELL_DEG: float = 0.05
+
+    RECSYS_EMBEDDING_STORE_ENABLED: bool = True
+    RECSYS_EMBEDDING_STORE_DIR: str = "/app/data/embeddings"
+    RECSYS_EMBEDDING_STORE_RELOAD_INTERVAL: int = 60
+    RECSYS_EMBEDDING_STORE_BUILD_MINUTE: int = 30
+    RECSYS_REDUCED_DIM: int = 96
+    RECSYS_REDUCTION_MODE: Literal["pca", "prefix"] = "pca"
+    RECSYS_RERANK_SIZE: int = 300
+
+    RECSYS_TILE_CACHE_ENABLED: bool = True
+    RECSYS_TILE_SIZE_DEG: float = 0.2
+    RECSYS_TILE_AGE_BUCKET: int = 5
+    RECSYS_TILE_TTL: int = 60 * 10
+
+    RECSYS_MAX_DISTANCE_KM: int = 20
+    RECSYS_ADAPTIVE_RADIUS_ENABLED: bool = True
+    RECSYS_RADIUS_TARGET_CANDIDATES: int = 1000
+    RECSYS_RADIUS_MIN_KM: float = 2
+    RECSYS_RADIUS_MAX_KM: float = 100
+    RECSYS_RADIUS_STEP_KM: float = 2
+    RECSYS_DENSITY_CELL_DEG: float = 0.1
+    RECSYS_DENSITY_REFRESH_INTERVAL: int = 60 * 60
+
+    RECSYS_CF_ENABLED: bool = True
+    RECSYS_CF_FACTORS_PATH: str = "/app/data/cf_factors.bin"
+    RECSYS_CF_DIM: int = 32
+    RECSYS_CF_EPOCHS: int = 10
+    RECSYS_CF_REG: float = 0.1
+    RECSYS_CF_SHARE: float = 0.2
+    RECSYS_CF_SOURCE_TIMEOUT_MS: int = 300
+    RECSYS_CF_RELOAD_INTERVAL: int = 60
+    RECSYS_CF_TRAIN_HOUR: int = 3
+
+    RECSYS_MMR_POOL_FACTOR: int = 3
+    RECSYS_MMR_RELEVANCE_WEIGHT: float = 1.0
+    RECSYS_MMR_DIVERSITY_WEIGHT: float = 0.3
+    RECSYS_MMR_DISTANCE_WEIGHT: float = 0.1
+
+    RECSYS_PRECOMPUTE_TILE_DEG: float = 0.5
+    RECSYS_PRECOMPUTE_WORKERS: int = 4
+    RECSYS_PRECOMPUTE_BLOCK_SIZE: int = 128
+    RECSYS_PRECOMPUTE_HOUR: int = 5
+    RECSYS_PRECOMPUTE_TTL: int = 60 * 60 * 12
+
+    API_WORKERS: int = 2
+
     LOG_LEVEL: str = "INFO"
     LOG_FORMAT: str = "json"
 
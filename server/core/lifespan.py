@@ -12,11 +12,20 @@ async def lifespan(app: FastAPI):
 
     kafka = await container.kafka()
     await kafka.consumer.start()
+    await kafka.embedding_consumer.start()
     await kafka.producer.start()
 
+    core = await container.core()
+    await core.refill_worker.start()
+    await core.index_sync_worker.start()
+
     yield
 
-    await kafka.producer.stop()
+    await core.index_sync_worker.stop()
+    await core.refill_worker.stop()
+
+    await kafka.embedding_consumer.stop()
     await kafka.consumer.stop()
+    await kafka.producer.stop()
 
     await container.shutdown_resources()
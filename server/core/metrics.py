@@ -0,0 +1,26 @@
+from prometheus_client import Counter, Histogram
+
+EMBEDDING_BATCH_SIZE = Histogram(
+    "embedding_batch_size",
+    "Number of texts encoded per embedding batch",
+    buckets=(1, 2, 4, 8, 16, 32, 64, 128)
+)
+
+EMBEDDING_QUEUE_WAIT_SECONDS = Histogram(
+    "embedding_queue_wait_seconds",
+    "Time an embedding request waits in the batcher before encoding starts",
+    buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
+)
+
+RECSYS_STAGE_SECONDS = Histogram(
+    "recsys_stage_seconds",
+    "Time spent in each stage of the recommendation pipeline",
+    ["stage"],
+    buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+)
+
+RECSYS_SOURCE_SKIPPED = Counter(
+    "recsys_source_skipped_total",
+    "Candidate source runs dropped for missing their time budget or failing",
+    ["source", "reason"]
+)
@@ -22,19 +22,26 @@ class Container(containers.DeclarativeContainer):
 
     repositories = providers.Singleton(
         init_repositories,
-        pool=infra_clients.provided.postgres
+        pool=infra_clients.provided.postgres,
+        settings=config
     )
 
     caches = providers.Singleton(
         init_caches,
-        redis=infra_clients.provided.redis
+        redis=infra_clients.provided.redis,
+        redis_binary=infra_clients.provided.redis_binary,
+        settings=config
     )
 
     core = providers.Singleton(
         init_core_components,
         profile_repo=repositories.provided.profile,
         recommendation_cache=caches.provided.recommendation,
-        swipe_cache=caches.provided.swipe,
+        seen_filter=caches.provided.seen,
+        inbound_likes=caches.provided.inbound_likes,
+        tile_cache=caches.provided.tiles,
+        index_changes=caches.provided.index_changes,
+        swipe_repo=repositories.provided.swipe,
         s3_client=infra_clients.provided.s3,
         clickhouse_client=infra_clients.provided.clickhouse,
         settings=config
@@ -44,7 +51,9 @@ class Container(containers.DeclarativeContainer):
         init_kafka_components,
         settings=config,
         profile_repo=repositories.provided.profile,
-        recommendation_cache=caches.provided.recommendation
+        recommendation_cache=caches.provided.recommendation,
+        tile_cache=caches.provided.tiles,
+        recommender=core.provided.recommender
     )
 
     services = providers.Singleton(
@@ -53,7 +62,9 @@ class Container(containers.DeclarativeContainer):
         media_repo=repositories.provided.media,
         swipe_repo=repositories.provided.swipe,
         recommendation_cache=caches.provided.recommendation,
-        swipe_cache=caches.provided.swipe,
+        seen_filter=caches.provided.seen,
+        inbound_likes=caches.provided.inbound_likes,
+        tile_cache=caches.provided.tiles,
         recommender=core.provided.recommender,
         uploader=core.provided.uploader,
         logger=core.provided.logger,
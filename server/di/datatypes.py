@@ -12,17 +12,23 @@ from domain.profile.services.profile_service import ProfileService
 from domain.recommendation.services.recommendation_service import RecommendationService
 from domain.swipe.services.swipe_service import SwipeService
 from infrastructure.cache.redis.recommendation_cache import RecommendationCache
-from infrastructure.cache.redis.swipe_cache import SwipeCache
+from infrastructure.cache.redis.seen_filter import SeenFilter
+from infrastructure.cache.redis.inbound_likes_filter import InboundLikesFilter
+from infrastructure.cache.redis.geo_tile_cache import GeoTileCache
+from infrastructure.cache.redis.index_change_channel import IndexChangeChannel
 from infrastructure.storage.s3.s3_uploader import S3Uploader
 from infrastructure.messaging.kafka.consumer import KafkaEventConsumer
 from infrastructure.messaging.kafka.producer import KafkaEventProducer
 from infrastructure.db.clickhouse.clickhouse_logger import ClickHouseLogger
 from recsys.embedding_recommender import EmbeddingRecommender
+from recsys.refill_worker import RecommendationRefillWorker
+from recsys.index_sync_worker import IndexSyncWorker
 
 @dataclass
 class InfraClients:
     postgres: asyncpg.Pool
     redis: redis.Redis
+    redis_binary: redis.Redis
     clickhouse: clickhouse_driver.Client
     s3: boto3.client
 
@@ -35,16 +41,22 @@ class Repositories:
 @dataclass
 class Caches:
     recommendation: RecommendationCache
-    swipe: SwipeCache
+    seen: SeenFilter
+    inbound_likes: InboundLikesFilter
+    tiles: GeoTileCache
+    index_changes: IndexChangeChannel
 
 @dataclass
 class KafkaComponents:
     producer: KafkaEventProducer
     consumer: KafkaEventConsumer
+    embedding_consumer: KafkaEventConsumer
 
 @dataclass
 class CoreComponents:
     recommender: EmbeddingRecommender
+    refill_worker: RecommendationRefillWorker
+    index_sync_worker: IndexSyncWorker
     uploader: S3Uploader
     logger: ClickHouseLogger
 
@@ -3,6 +3,7 @@ import redis.asyncio as redis
 import clickhouse_driver
 import boto3
 from botocore.config import Config
+from functools import partial
 
 from core.config import Settings
 from di.datatypes import InfraClients, Repositories, Caches, CoreComponents, KafkaComponents, Services
@@ -14,13 +15,25 @@ from domain.profile.services.profile_service import ProfileService
 from domain.recommendation.services.recommendation_service import RecommendationService
 from domain.swipe.services.swipe_service import SwipeService
 from infrastructure.cache.redis.recommendation_cache import RecommendationCache
-from infrastructure.cache.redis.swipe_cache import SwipeCache
+from infrastructure.cache.redis.seen_filter import SeenFilter
+from infrastructure.cache.redis.inbound_likes_filter import InboundLikesFilter
+from infrastructure.cache.redis.geo_tile_cache import GeoTileCache
+from infrastructure.cache.redis.index_change_channel import IndexChangeChannel
 from infrastructure.storage.s3.s3_uploader import S3Uploader
 from infrastructure.messaging.kafka.consumer import KafkaEventConsumer
 from infrastructure.messaging.kafka.producer import KafkaEventProducer
-from event_handlers.dispatcher import handle_kafka_event
+from event_handlers.dispatcher import handle_kafka_event, handle_profile_text_event
 from infrastructure.db.clickhouse.clickhouse_logger import ClickHouseLogger
 from recsys.embedding_recommender import EmbeddingRecommender
+from recsys.vector_index import IVFVectorIndex
+from recsys.inference_executor import InferenceExecutor
+from recsys.model_registry import get_embedding_model
+from recsys.refill_worker import RecommendationRefillWorker
+from recsys.index_sync_worker import IndexSyncWorker
+from recsys.tile_candidates import TileCandidateLoader
+from recsys.density_grid import DensityGrid
+from recsys.collaborative import CollaborativeModelStore
+from recsys.embedding_store import SharedEmbeddingStore
 
 async def init_infra_clients(settings: Settings) -> InfraClients:
     postgres_pool = await asyncpg.create_pool(
@@ -36,6 +49,12 @@ async def init_infra_clients(settings: Settings) -> InfraClients:
         decode_responses=True
     )
 
+    redis_binary_client = redis.Redis(
+        host=settings.REDIS_HOST, 
+        port=settings.REDIS_PORT, 
+        db=settings.REDIS_FASTAPI_CACHE
+    )
+
     clickhouse_client = clickhouse_driver.Client(
         host=settings.CLICKHOUSE_HOST,
         port=settings.CLICKHOUSE_PORT,
@@ -56,12 +75,13 @@ async def init_infra_clients(settings: Settings) -> InfraClients:
     return InfraClients(
         postgres=postgres_pool,
         redis=redis_client,
+        redis_binary=redis_binary_client,
         clickhouse=clickhouse_client,
         s3=s3_client,
     )
 
-def init_repositories(pool: asyncpg.Pool) -> Repositories:
-    profile_repo = ProfileRepository(pool)
+def init_repositories(pool: asyncpg.Pool, settings: Settings) -> Repositories:
+    profile_repo = ProfileRepository(pool, embedding_storage=settings.EMBEDDING_STORAGE)
     media_repo = MediaRepository(pool)
     swipe_repo = SwipeRepository(pool)
 
@@ -71,29 +91,130 @@ def init_repositories(pool: asyncpg.Pool) -> Repositories:
         swipe=swipe_repo
     )
 
-def init_caches(redis: redis.Redis) -> Caches:
-    recommendation_cache = RecommendationCache(redis)
-    swipe_cache = SwipeCache(redis)
+def init_caches(redis: redis.Redis, redis_binary: redis.Redis, settings: Settings) -> Caches:
+    recommendation_cache = RecommendationCache(
+        redis,
+        compute_lock_ttl=settings.RECSYS_COMPUTE_LOCK_TTL,
+        holders_ttl=settings.RECSYS_PRECOMPUTE_TTL
+    )
+    seen_filter = SeenFilter(redis)
+    inbound_likes = InboundLikesFilter(redis)
+    tile_cache = GeoTileCache(
+        redis_binary,
+        tile_size=settings.RECSYS_TILE_SIZE_DEG,
+        age_bucket_size=settings.RECSYS_TILE_AGE_BUCKET,
+        ttl=settings.RECSYS_TILE_TTL
+    )
 
     return Caches(
         recommendation=recommendation_cache,
-        swipe=swipe_cache
+        seen=seen_filter,
+        inbound_likes=inbound_likes,
+        tiles=tile_cache,
+        index_changes=IndexChangeChannel(redis)
     )
 
 def init_core_components(
     profile_repo: ProfileRepository, 
     recommendation_cache: RecommendationCache,
-    swipe_cache: SwipeCache,
+    seen_filter: SeenFilter,
+    inbound_likes: InboundLikesFilter,
+    tile_cache: GeoTileCache,
+    index_changes: IndexChangeChannel,
+    swipe_repo: SwipeRepository,
     s3_client: boto3.client, 
     clickhouse_client: clickhouse_driver.Client,
     settings: Settings
 ) -> CoreComponents:
+    index = None
+    if settings.RECSYS_ANN_INDEX_ENABLED:
+        index = IVFVectorIndex(
+            n_lists=settings.RECSYS_ANN_INDEX_LISTS,
+            n_probe=settings.RECSYS_ANN_INDEX_PROBES,
+            rerank_size=settings.RECSYS_RERANK_SIZE,
+            cell_deg=settings.RECSYS_ANN_INDEX_CELL_DEG
+        )
+
+    embedding_store = None
+    if settings.RECSYS_EMBEDDING_STORE_ENABLED and index is not None:
+        embedding_store = SharedEmbeddingStore(
+            settings.RECSYS_EMBEDDING_STORE_DIR,
+            reload_interval=settings.RECSYS_EMBEDDING_STORE_RELOAD_INTERVAL
+        )
+
+    tile_loader = None
+    if settings.RECSYS_TILE_CACHE_ENABLED:
+        tile_loader = TileCandidateLoader(profile_repo, tile_cache)
+
+    density_grid = None
+    if settings.RECSYS_ADAPTIVE_RADIUS_ENABLED:
+        density_grid = DensityGrid(
+            cell_size=settings.RECSYS_DENSITY_CELL_DEG,
+            target_candidates=settings.RECSYS_RADIUS_TARGET_CANDIDATES,
+            min_radius_km=settings.RECSYS_RADIUS_MIN_KM,
+            max_radius_km=settings.RECSYS_RADIUS_MAX_KM,
+            radius_step_km=settings.RECSYS_RADIUS_STEP_KM
+        )
+
+    collaborative = None
+    if settings.RECSYS_CF_ENABLED and tile_loader is not None:
+        collaborative = CollaborativeModelStore(
+            settings.RECSYS_CF_FACTORS_PATH,
+            reload_interval=settings.RECSYS_CF_RELOAD_INTERVAL
+        )
+
+    inference = InferenceExecutor(
+        max_workers=settings.EMBEDDING_INFERENCE_WORKERS,
+        torch_threads=settings.EMBEDDING_INFERENCE_THREADS
+    )
+
+    model_factory = partial(
+        get_embedding_model,
+        backend=settings.EMBEDDING_BACKEND,
+        model_name=settings.EMBEDDING_MODEL_NAME,
+        onnx_file=settings.EMBEDDING_ONNX_FILE
+    )
+
     recommender = EmbeddingRecommender(
         profile_repo=profile_repo,
         recommendation_cache=recommendation_cache,
-        swipe_cache=swipe_cache
+        seen_filter=seen_filter,
+        inbound_likes=inbound_likes,
+        swipe_repo=swipe_repo,
+        index_changes=index_changes,
+        model_factory=model_factory,
+        index=index,
+        embedding_store=embedding_store,
+        max_distance_search=settings.RECSYS_MAX_DISTANCE_KM,
+        tile_loader=tile_loader,
+        density_grid=density_grid,
+        density_refresh_interval=settings.RECSYS_DENSITY_REFRESH_INTERVAL,
+        embedding_source_timeout=settings.RECSYS_EMBEDDING_SOURCE_TIMEOUT_MS / 1000,
+        random_source_timeout=settings.RECSYS_RANDOM_SOURCE_TIMEOUT_MS / 1000,
+        collaborative=collaborative,
+        collaborative_share=settings.RECSYS_CF_SHARE,
+        collaborative_source_timeout=settings.RECSYS_CF_SOURCE_TIMEOUT_MS / 1000,
+        mmr_pool_factor=settings.RECSYS_MMR_POOL_FACTOR,
+        mmr_relevance_weight=settings.RECSYS_MMR_RELEVANCE_WEIGHT,
+        mmr_diversity_weight=settings.RECSYS_MMR_DIVERSITY_WEIGHT,
+        mmr_distance_weight=settings.RECSYS_MMR_DISTANCE_WEIGHT,
+        index_refresh_interval=settings.RECSYS_ANN_INDEX_REFRESH_INTERVAL,
+        inference=inference,
+        embedding_batch_size=settings.EMBEDDING_BATCH_MAX_SIZE,
+        embedding_batch_wait_ms=settings.EMBEDDING_BATCH_MAX_WAIT_MS,
+        embedding_queue_size=settings.EMBEDDING_INFERENCE_QUEUE_SIZE,
+        queue_size=settings.RECSYS_QUEUE_SIZE,
+        queue_low_watermark=settings.RECSYS_QUEUE_LOW_WATERMARK
+    )
+
+    refill_worker = RecommendationRefillWorker(
+        recommender=recommender,
+        cache=recommendation_cache,
+        concurrency=settings.RECSYS_REFILL_CONCURRENCY
     )
 
+    index_sync_worker = IndexSyncWorker(recommender, index_changes)
+
     uploader = S3Uploader(
         client=s3_client, 
         bucket_name=settings.S3_BUCKET_NAME
@@ -103,21 +224,41 @@ def init_core_components(
 
     return CoreComponents(
         recommender=recommender,
+        refill_worker=refill_worker,
+        index_sync_worker=index_sync_worker,
         uploader=uploader,
         logger=logger
     )
 
-def init_kafka_components(settings: Settings, profile_repo: ProfileRepository, recommendation_cache: RecommendationCache) -> KafkaComponents:
+def init_kafka_components(
+    settings: Settings,
+    profile_repo: ProfileRepository,
+    recommendation_cache: RecommendationCache,
+    tile_cache: GeoTileCache,
+    recommender: EmbeddingRecommender
+) -> KafkaComponents:
     producer = KafkaEventProducer(settings.kafka_bootstrap_servers)
     consumer = KafkaEventConsumer(
         bootstrap_servers=settings.kafka_bootstrap_servers,
         topics=[settings.KAFKA_GEO_TOPIC, settings.KAFKA_VIDEO_TOPIC],
-        callback=lambda event: handle_kafka_event(event, profile_repo, recommendation_cache, producer, settings)
+        callback=lambda event: handle_kafka_event(event, profile_repo, recommendation_cache, tile_cache, recommender, producer, settings)
+    )
+
+    embedding_consumer = KafkaEventConsumer(
+        bootstrap_servers=settings.kafka_bootstrap_servers,
+        topics=[settings.KAFKA_PROFILE_TEXT_TOPIC],
+        callback=lambda event: handle_profile_text_event(event, recommender, recommendation_cache),
+        group_id=settings.KAFKA_EMBEDDING_CONSUMER_GROUP,
+        auto_offset_reset='earliest',
+        max_concurrency=settings.KAFKA_EMBEDDING_CONSUMER_CONCURRENCY,
+        max_retries=settings.KAFKA_EMBEDDING_CONSUMER_RETRIES,
+        dead_letter=lambda event: producer.send_event(settings.KAFKA_PROFILE_TEXT_DLQ_TOPIC, event)
     )
 
     return KafkaComponents(
         producer=producer,
-        consumer=consumer
+        consumer=consumer,
+        embedding_consumer=embedding_consumer
     )
 
 def init_services(
@@ -125,7 +266,9 @@ def init_services(
     media_repo: MediaRepository,
     swipe_repo: SwipeRepository,
     recommendation_cache: RecommendationCache,
-    swipe_cache: SwipeCache,
+    seen_filter: SeenFilter,
+    inbound_likes: InboundLikesFilter,
+    tile_cache: GeoTileCache,
     recommender: EmbeddingRecommender,
     uploader: S3Uploader,
     logger: ClickHouseLogger,
@@ -137,6 +280,7 @@ def init_services(
         producer=producer,
         recommender=recommender,
         cache=recommendation_cache,
+        tile_cache=tile_cache,
         settings=settings
     )
 
@@ -152,7 +296,9 @@ def init_services(
         profile_service=profile_service,
         producer=producer,
         logger=logger,
-        swipe_cache=swipe_cache,
+        seen_filter=seen_filter,
+        inbound_likes=inbound_likes,
+        recommendation_cache=recommendation_cache,
         settings=settings
     )
 
@@ -1,6 +1,9 @@
 import asyncpg
 import numpy as np
-from typing import List, Optional, Any
+from datetime import datetime
+from typing import List, Optional, Any, Tuple
+
+from shared.utils.embedding_codec import encode_embedding, decode_embedding
 
 ALLOWED_FIELDS = {
     "name", 
@@ -13,9 +16,21 @@ ALLOWED_FIELDS = {
     "interesting_gender"
 }
 
+def with_decoded_embedding(record: Optional[asyncpg.Record]) -> Optional[dict]:
+    if record is None:
+        return None
+    row = dict(record)
+    packed = row.pop('about_embedding_packed', None)
+    if packed is not None:
+        row['about_embedding'] = decode_embedding(packed)
+    elif row.get('about_embedding') is not None:
+        row['about_embedding'] = np.asarray(row['about_embedding'], dtype=np.float32)
+    return row
+
 class ProfileRepository:
-    def __init__(self, pool: asyncpg.Pool):
+    def __init__(self, pool: asyncpg.Pool, embedding_storage: str = 'float32'):
         self.pool = pool
+        self.embedding_storage = embedding_storage
 
     async def save_profile(
         self,
@@ -52,12 +67,12 @@ class ProfileRepository:
             """, user_id, name, gender, city, age, interesting_gender, about, latitude, longitude)
             return row["id"]
     
-    async def get_profile_by_user_id(self, user_id: int) -> Optional[asyncpg.Record]:
+    async def get_profile_by_user_id(self, user_id: int) -> Optional[dict]:
         async with self.pool.acquire() as conn:
             row = await conn.fetchrow("""
                 SELECT * FROM profiles WHERE user_id = $1
             """, user_id)
-            return row
+            return with_decoded_embedding(row)
     
     async def toggle_profile_active(self, user_id: int, is_active: bool):
         async with self.pool.acquire() as conn:
@@ -80,31 +95,95 @@ class ProfileRepository:
             await conn.execute(query, value, user_id)
     
     async def update_embedding(self, user_id: int, embedding: np.ndarray):
+        await self.update_embeddings([(user_id, embedding)])
+
+    async def update_embeddings(self, embeddings: List[Tuple[int, np.ndarray]]):
+        if not embeddings:
+            return
+
         async with self.pool.acquire() as conn:
+            if self.embedding_storage == 'array':
+                await conn.executemany("""
+                    UPDATE profiles 
+                    SET about_embedding = $2,
+                        about_embedding_packed = NULL,
+                        about_embedding_updated_at = now()
+                    WHERE user_id = $1
+                """, [(user_id, embedding.tolist()) for user_id, embedding in embeddings])
+                return
+
             await conn.execute("""
-                UPDATE profiles 
-                SET about_embedding = $1 
-                WHERE user_id = $2
-            """, embedding.tolist(), user_id)
+                UPDATE profiles AS p
+                SET about_embedding_packed = v.packed,
+                    about_embedding = NULL,
+                    about_embedding_updated_at = now()
+                FROM unnest($1::bigint[], $2::bytea[]) AS v(user_id, packed)
+                WHERE p.user_id = v.user_id
+            """,
+                [user_id for user_id, _ in embeddings],
+                [encode_embedding(embedding, self.embedding_storage) for _, embedding in embeddings]
+            )
     
+    async def get_active_profiles_with_embeddings(self) -> List[dict]:
+        async with self.pool.acquire() as conn:
+            records = await conn.fetch("""
+                SELECT user_id, about_embedding, about_embedding_packed,
+                    latitude, longitude, gender, age, is_active
+                FROM profiles
+                WHERE is_active = TRUE
+                AND (about_embedding_packed IS NOT NULL OR about_embedding IS NOT NULL)
+            """)
+            return [with_decoded_embedding(record) for record in records]
+
+    async def get_active_profile_attributes(self, embeddings_since: datetime) -> List[dict]:
+        async with self.pool.acquire() as conn:
+            records = await conn.fetch("""
+                SELECT user_id, latitude, longitude, gender, age, is_active,
+                    CASE WHEN about_embedding_updated_at > $1 THEN about_embedding END AS about_embedding,
+                    CASE WHEN about_embedding_updated_at > $1 THEN about_embedding_packed END AS about_embedding_packed
+                FROM profiles
+                WHERE is_active = TRUE
+                AND (about_embedding_packed IS NOT NULL OR about_embedding IS NOT NULL)
+            """, embeddings_since)
+            return [with_decoded_embedding(record) for record in records]
+
+    async def sample_profiles_with_embeddings(self, limit: int) -> List[dict]:
+        async with self.pool.acquire() as conn:
+            records = await conn.fetch("""
+                SELECT user_id, about, about_embedding, about_embedding_packed
+                FROM profiles
+                WHERE about IS NOT NULL
+                AND (about_embedding_packed IS NOT NULL OR about_embedding IS NOT NULL)
+                ORDER BY random()
+                LIMIT $1
+            """, limit)
+            return [with_decoded_embedding(record) for record in records]
+
     async def get_candidates_with_embeddings(
         self,
         user_id: int,
         user: dict,
         max_distance: int,
         min_age: int,
-        max_age: int
-    ) -> List[asyncpg.Record]:
+        max_age: int,
+        exclude: Optional[List[int]] = None
+    ) -> List[dict]:
         async with self.pool.acquire() as conn:
             candidates = await conn.fetch(
                 """
-                SELECT *, ST_Distance(location, ST_MakePoint($2, $1)::geography) AS dist
-                FROM profiles 
+                SELECT p.*, ST_Distance(location, ST_MakePoint($2, $1)::geography) AS dist
+                FROM profiles p
                 WHERE user_id != $3
+                AND NOT (user_id = ANY($8::bigint[]))
+                AND NOT EXISTS (
+                    SELECT 1 FROM swipes s
+                    WHERE s.from_user_id = $3
+                    AND s.to_user_id = p.user_id
+                )
                 AND is_active = TRUE
                 AND location IS NOT NULL
                 AND ST_DWithin(location, ST_MakePoint($2, $1)::geography, $4)
-                AND about_embedding IS NOT NULL
+                AND (about_embedding_packed IS NOT NULL OR about_embedding IS NOT NULL)
                 AND gender = ANY(
                     CASE 
                         WHEN $5 = 'any' THEN ARRAY['male'::gender, 'female'::gender]
@@ -115,27 +194,73 @@ class ProfileRepository:
                 LIMIT 100
                 """,
                 user['latitude'], user['longitude'], user_id, max_distance * 1000,
-                user['interesting_gender'], min_age, max_age
+                user['interesting_gender'], min_age, max_age, exclude or []
+            )
+            return [with_decoded_embedding(candidate) for candidate in candidates]
+
+    async def get_active_density(self, cell_size: float) -> List[Tuple[int, int, str, int]]:
+        async with self.pool.acquire() as conn:
+            records = await conn.fetch("""
+                SELECT floor(latitude / $1)::int AS lat_idx,
+                    floor(longitude / $1)::int AS lon_idx,
+                    gender::text AS gender,
+                    count(*) AS count
+                FROM profiles
+                WHERE is_active = TRUE
+                AND location IS NOT NULL
+                GROUP BY 1, 2, 3
+            """, cell_size)
+            return [(r['lat_idx'], r['lon_idx'], r['gender'], r['count']) for r in records]
+
+    async def get_tile_profiles(
+        self,
+        lat_min: float,
+        lat_max: float,
+        lon_min: float,
+        lon_max: float,
+        genders: List[str],
+        min_age: int,
+        max_age: int
+    ) -> List[dict]:
+        async with self.pool.acquire() as conn:
+            records = await conn.fetch(
+                """
+                SELECT user_id, latitude, longitude, gender::text AS gender, age,
+                    about_embedding, about_embedding_packed
+                FROM profiles
+                WHERE is_active = TRUE
+                AND location IS NOT NULL
+                AND location && ST_MakeEnvelope($3, $1, $4, $2, 4326)::geography
+                AND latitude >= $1 AND latitude < $2
+                AND longitude >= $3 AND longitude < $4
+                AND gender::text = ANY($5::text[])
+                AND age BETWEEN $6 AND $7
+                """,
+                lat_min, lat_max, lon_min, lon_max, genders, min_age, max_age
             )
-            return candidates
+            return [with_decoded_embedding(record) for record in records]
 
-    async def get_candidates_by_criteria(
+    async def sample_candidates_by_criteria(
         self,
         user_id: int,
         user: dict,
         rec_list: List[int],
         min_age: int,
         max_age: int,
-        max_distance: int
-    ) -> List[int]:
+        max_distance: int,
+        limit: int
+    ) -> List[Tuple[int, float]]:
         async with self.pool.acquire() as conn:
             records = await conn.fetch(
                 """
-                SELECT * FROM profiles
+                SELECT user_id, ST_Distance(location, ST_MakePoint($6, $5)::geography) AS dist
+                FROM profiles p
                 WHERE user_id != $1
-                AND (
-                    COALESCE(array_length($3::bigint[], 1), 0) = 0 
-                    OR user_id != ANY($3::bigint[])
+                AND NOT (user_id = ANY($3::bigint[]))
+                AND NOT EXISTS (
+                    SELECT 1 FROM swipes s
+                    WHERE s.from_user_id = $1
+                    AND s.to_user_id = p.user_id
                 )
                 AND is_active = TRUE
                 AND location IS NOT NULL
@@ -147,17 +272,20 @@ class ProfileRepository:
                     END
                 )
                 AND age BETWEEN $7 AND $8
+                ORDER BY random()
+                LIMIT $9
                 """,
                 user_id,                    
                 user["interesting_gender"],
-                rec_list,
+                rec_list or [],
                 max_distance * 1000,
                 user["latitude"],
                 user["longitude"],
                 min_age,
-                max_age
+                max_age,
+                limit
             )
-            return [record['user_id'] for record in records]
+            return [(record['user_id'], record['dist']) for record in records]
     
     async def reset_city(self, user_id: int):
         async with self.pool.acquire() as conn:
@@ -5,8 +5,9 @@ from domain.profile.repositories.profile_repository import ProfileRepository
 from recsys.embedding_recommender import EmbeddingRecommender
 from infrastructure.messaging.kafka.producer import KafkaEventProducer
 from infrastructure.cache.redis.recommendation_cache import RecommendationCache
+from infrastructure.cache.redis.geo_tile_cache import GeoTileCache
 from api.v1.schemas.profile import SaveProfileRequest, ToggleActiveRequest, UpdateFieldRequest, SaveProfileResponse, GetProfileResponse
-from contracts.kafka.events import LocationResolveResultEvent
+from contracts.kafka.events import LocationResolveResultEvent, ProfileTextChangedEvent
 from tasks.location.tasks import update_user_location
 from tasks.video.tasks import validate_video
 
@@ -17,12 +18,14 @@ class ProfileService:
         producer: KafkaEventProducer,
         recommender: EmbeddingRecommender,
         cache: RecommendationCache,
+        tile_cache: GeoTileCache,
         settings: Settings,
     ):
         self.profile_repo = profile_repo
         self.producer = producer
         self.recommender = recommender
         self.cache = cache
+        self.tile_cache = tile_cache
         self.settings = settings
         self.fallback_coordinates = (55.625578, 37.6063916)
 
@@ -34,6 +37,8 @@ class ProfileService:
         lat = data.latitude or self.fallback_coordinates[0]
         lon = data.longitude or self.fallback_coordinates[1]
 
+        previous = await self.profile_repo.get_profile_by_user_id(user_id)
+
         profile_id = await self.profile_repo.save_profile(
             user_id=user_id,
             name=data.name,
@@ -46,17 +51,22 @@ class ProfileService:
             longitude=lon,
         )
 
-        await self.recommender.update_user_embedding(user_id)
+        await self._invalidate_tiles(user_id, previous)
+        await self.cache.evict_candidate(user_id)
+        await self._notify_profile_text_changed(user_id)
 
         return SaveProfileResponse(profile_id=profile_id)
 
     async def update_field(self, user_id: int, data: UpdateFieldRequest):
+        previous = None
+        if data.field_name in {'age', 'gender', 'coordinates'}:
+            previous = await self.profile_repo.get_profile_by_user_id(user_id)
+
         if data.field_name != "coordinates":
             await self.profile_repo.update_profile_field(user_id, data.field_name, data.value)
         
         if data.field_name == 'about':
-            await self.recommender.update_user_embedding(user_id)
-            await self.cache.clear(user_id)
+            await self._notify_profile_text_changed(user_id)
 
         if data.field_name == 'city':
             await self._notify_geo_waiting(user_id)
@@ -68,8 +78,19 @@ class ProfileService:
             await self.profile_repo.reset_city(user_id)
             await self.cache.clear(user_id)
 
+        if data.field_name in {'about', 'age', 'gender', 'coordinates'}:
+            await self.cache.evict_candidate(user_id)
+
+        if data.field_name in {'age', 'gender', 'coordinates'}:
+            await self._invalidate_tiles(user_id, previous)
+            await self.recommender.sync_user_index(user_id)
+
     async def toggle_active(self, user_id: int, data: ToggleActiveRequest):
         await self.profile_repo.toggle_profile_active(user_id, data.is_active)
+        await self._invalidate_tiles(user_id)
+        if not data.is_active:
+            await self.cache.evict_candidate(user_id)
+        await self.recommender.set_user_active(user_id, data.is_active)
 
     async def get_profile_by_user_id(self, user_id: int) -> Optional[GetProfileResponse]:
         row = await self.profile_repo.get_profile_by_user_id(user_id)
@@ -78,6 +99,14 @@ class ProfileService:
     def verify_video(self, user_id: int, file_bytes: bytes):
         validate_video.delay(user_id, file_bytes)
 
+    async def _invalidate_tiles(self, user_id: int, previous: Optional[dict] = None):
+        await self.tile_cache.invalidate(previous)
+        await self.tile_cache.invalidate(await self.profile_repo.get_profile_by_user_id(user_id))
+
     async def _notify_geo_waiting(self, user_id: int):
         event = LocationResolveResultEvent(user_id=user_id, status='waited')
         await self.producer.send_event(self.settings.KAFKA_GEO_NOTIFICATIONS_TOPIC, event.model_dump())
+
+    async def _notify_profile_text_changed(self, user_id: int):
+        event = ProfileTextChangedEvent(user_id=user_id)
+        await self.producer.send_event(self.settings.KAFKA_PROFILE_TEXT_TOPIC, event.model_dump())
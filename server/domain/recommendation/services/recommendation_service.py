@@ -1,15 +1,20 @@
+from typing import Optional
+
 from recsys.embedding_recommender import EmbeddingRecommender
 from api.v1.schemas.recommendation import GetRecommendationsResponse, RecommendationItem
+from shared.utils.cursor import encode_cursor, decode_cursor
 
 class RecommendationService:
     def __init__(self, recommender: EmbeddingRecommender):
         self.recommender = recommender
 
-    async def get_recommendations(self, user_id: int, count: int) -> GetRecommendationsResponse:
-        recommendations = await self.recommender.get_hybrid_recommendations(user_id, count)
+    async def get_recommendations(self, user_id: int, count: int, cursor: Optional[str] = None) -> GetRecommendationsResponse:
+        after = decode_cursor(cursor) if cursor else None
+        recommendations, next_after = await self.recommender.get_hybrid_recommendations(user_id, count, after)
         return GetRecommendationsResponse(
             recommendations=[
                 RecommendationItem(user_id=uid, distance=dist)
                 for uid, dist in recommendations
-            ]
+            ],
+            next_cursor=encode_cursor(next_after) if next_after is not None else None
         )
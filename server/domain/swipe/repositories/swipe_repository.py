@@ -1,5 +1,5 @@
 import asyncpg
-from typing import Optional
+from typing import List, Optional
 
 class SwipeRepository:
     def __init__(self, pool: asyncpg.Pool):
@@ -11,12 +11,33 @@ class SwipeRepository:
         to_user_id: int,
         action: str,
         message: Optional[str] = None
-    ):
+    ) -> Optional[str]:
         async with self.pool.acquire() as conn:
-            await conn.execute("""
+            return await conn.fetchval("""
+                WITH previous AS (
+                    SELECT action FROM swipes
+                    WHERE from_user_id = $1 AND to_user_id = $2
+                )
                 INSERT INTO swipes (from_user_id, to_user_id, action, message)
                 VALUES ($1, $2, $3, $4)
                 ON CONFLICT (from_user_id, to_user_id) DO UPDATE
                 SET action = EXCLUDED.action,
                     message = EXCLUDED.message
+                RETURNING (SELECT action FROM previous)
             """, from_user_id, to_user_id, action, message)
+
+    async def get_swiped_user_ids(self, from_user_id: int) -> List[int]:
+        async with self.pool.acquire() as conn:
+            records = await conn.fetch("""
+                SELECT to_user_id FROM swipes WHERE from_user_id = $1
+            """, from_user_id)
+            return [record['to_user_id'] for record in records]
+
+    async def get_inbound_liker_ids(self, to_user_id: int) -> List[int]:
+        async with self.pool.acquire() as conn:
+            records = await conn.fetch("""
+                SELECT from_user_id FROM swipes
+                WHERE to_user_id = $1
+                AND action IN ('like', 'question')
+            """, to_user_id)
+            return [record['from_user_id'] for record in records]
@@ -3,7 +3,9 @@ from domain.swipe.repositories.swipe_repository import SwipeRepository
 from domain.profile.services.profile_service import ProfileService
 from infrastructure.messaging.kafka.producer import KafkaEventProducer
 from infrastructure.db.clickhouse.clickhouse_logger import ClickHouseLogger
-from infrastructure.cache.redis.swipe_cache import SwipeCache
+from infrastructure.cache.redis.seen_filter import SeenFilter
+from infrastructure.cache.redis.inbound_likes_filter import InboundLikesFilter
+from infrastructure.cache.redis.recommendation_cache import RecommendationCache
 from api.v1.schemas.swipe import AddSwipeRequest
 from contracts.kafka.events import SwipeEvent
 
@@ -14,28 +16,38 @@ class SwipeService:
         profile_service: ProfileService,
         producer: KafkaEventProducer,
         logger: ClickHouseLogger,
-        swipe_cache: SwipeCache,
+        seen_filter: SeenFilter,
+        inbound_likes: InboundLikesFilter,
+        recommendation_cache: RecommendationCache,
         settings: Settings
     ):
         self.swipe_repo = swipe_repo
         self.profile_service = profile_service
         self.producer = producer
         self.logger = logger
-        self.cache = swipe_cache
+        self.seen_filter = seen_filter
+        self.inbound_likes = inbound_likes
+        self.recommendation_cache = recommendation_cache
         self.settings = settings
 
     async def add_swipe(self, username: str, swipe: AddSwipeRequest):
-        await self.swipe_repo.save_swipe(
+        previous_action = await self.swipe_repo.save_swipe(
             from_user_id=swipe.from_user_id,
             to_user_id=swipe.to_user_id,
             action=swipe.action,
             message=swipe.message
         )
 
-        await self.cache.set(
+        await self.seen_filter.add(
             swipe.from_user_id,
             swipe.to_user_id
         )
+        await self.recommendation_cache.remove(swipe.from_user_id, [swipe.to_user_id])
+
+        if swipe.action in {"like", "question"}:
+            await self.inbound_likes.add(swipe.to_user_id, swipe.from_user_id)
+        elif previous_action in {"like", "question"}:
+            await self.inbound_likes.clear(swipe.to_user_id)
 
         from_profile = await self.profile_service.get_profile_by_user_id(swipe.from_user_id)
         to_profile = await self.profile_service.get_profile_by_user_id(swipe.to_user_id)
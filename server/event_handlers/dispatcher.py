@@ -4,8 +4,11 @@ from domain.profile.repositories.profile_repository import ProfileRepository
 from infrastructure.messaging.kafka.producer import KafkaEventProducer
 from event_handlers.geo import on_geo_resolve_event
 from event_handlers.video import on_video_validation_event
+from event_handlers.profile_text import on_profile_text_changed_event
 from infrastructure.cache.redis.recommendation_cache import RecommendationCache
-from contracts.kafka.events import LocationResolveResultEvent, VideoValidationResultEvent
+from infrastructure.cache.redis.geo_tile_cache import GeoTileCache
+from recsys.embedding_recommender import EmbeddingRecommender
+from contracts.kafka.events import LocationResolveResultEvent, VideoValidationResultEvent, ProfileTextChangedEvent
 from core.config import Settings
 from core.logger import logger
 
@@ -13,6 +16,8 @@ async def handle_kafka_event(
     event: dict,
     profile_repo: ProfileRepository,
     recommendation_cache: RecommendationCache,
+    tile_cache: GeoTileCache,
+    recommender: EmbeddingRecommender,
     producer: KafkaEventProducer,
     settings: Settings
 ):
@@ -23,7 +28,7 @@ async def handle_kafka_event(
 
         if 'status' in event:
             geo_event = LocationResolveResultEvent(**event)
-            return await on_geo_resolve_event(geo_event, profile_repo, recommendation_cache, producer, settings)
+            return await on_geo_resolve_event(geo_event, profile_repo, recommendation_cache, tile_cache, recommender, producer, settings)
 
         raise ValueError(f"Unknown event type: {event}")
 
@@ -31,3 +36,16 @@ async def handle_kafka_event(
         logger.error(f"Validation failed: {e.json()}")
     except Exception as e:
         logger.error(f"Unexpected error while handling event: {e}")
+
+async def handle_profile_text_event(
+    event: dict,
+    recommender: EmbeddingRecommender,
+    recommendation_cache: RecommendationCache
+):
+    try:
+        text_event = ProfileTextChangedEvent(**event)
+    except ValidationError as e:
+        logger.error(f"Validation failed: {e.json()}")
+        return
+
+    return await on_profile_text_changed_event(text_event, recommender, recommendation_cache)
@@ -2,12 +2,16 @@ from core.config import Settings
 from domain.profile.repositories.profile_repository import ProfileRepository
 from infrastructure.messaging.kafka.producer import KafkaEventProducer
 from infrastructure.cache.redis.recommendation_cache import RecommendationCache
+from infrastructure.cache.redis.geo_tile_cache import GeoTileCache
+from recsys.embedding_recommender import EmbeddingRecommender
 from contracts.kafka.events import LocationResolveResultEvent
 
 async def on_geo_resolve_event(
     event: LocationResolveResultEvent,
     repo: ProfileRepository, 
     cache: RecommendationCache, 
+    tile_cache: GeoTileCache,
+    recommender: EmbeddingRecommender,
     producer: KafkaEventProducer,
     settings: Settings
 ):
@@ -18,10 +22,15 @@ async def on_geo_resolve_event(
         latitude = event.latitude
         longitude = event.longitude
 
+        previous = await repo.get_profile_by_user_id(user_id)
         await repo.update_profile_field(user_id, 'latitude', latitude)
         await repo.update_profile_field(user_id, 'longitude', longitude)
 
         await cache.clear(user_id)
+        await cache.evict_candidate(user_id)
+        await tile_cache.invalidate(previous)
+        await tile_cache.invalidate(await repo.get_profile_by_user_id(user_id))
+        await recommender.sync_user_index(user_id)
 
         event = LocationResolveResultEvent(
             user_id=user_id,
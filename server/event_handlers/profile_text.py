@@ -0,0 +1,11 @@
+from recsys.embedding_recommender import EmbeddingRecommender
+from infrastructure.cache.redis.recommendation_cache import RecommendationCache
+from contracts.kafka.events import ProfileTextChangedEvent
+
+async def on_profile_text_changed_event(
+    event: ProfileTextChangedEvent,
+    recommender: EmbeddingRecommender,
+    cache: RecommendationCache
+):
+    await recommender.update_user_embedding(event.user_id)
+    await cache.clear(event.user_id)
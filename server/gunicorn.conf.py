@@ -0,0 +1,19 @@
+from core.config import get_settings
+
+settings = get_settings()
+
+bind = "0.0.0.0:8000"
+workers = settings.API_WORKERS
+worker_class = "uvicorn.workers.UvicornWorker"
+preload_app = settings.EMBEDDING_PRELOAD
+
+def on_starting(server):
+    if not settings.EMBEDDING_PRELOAD:
+        return
+
+    from recsys.model_registry import preload_models
+    preload_models(
+        backend=settings.EMBEDDING_BACKEND,
+        model_name=settings.EMBEDDING_MODEL_NAME,
+        onnx_file=settings.EMBEDDING_ONNX_FILE
+    )
@@ -0,0 +1,168 @@
+import hashlib
+import math
+import numpy as np
+from redis.asyncio import Redis
+from redis.exceptions import WatchError
+from typing import Iterable, List, Optional, Tuple
+
+class RedisBloomFilter:
+    def __init__(
+            self,
+            redis: Redis,
+            prefix: str,
+            capacity: int = 1024,
+            error_rate: float = 0.01,
+            ttl: int = 60 * 60 * 24 * 30,
+            pending_ttl: int = 60 * 10
+    ):
+        self.redis = redis
+        self.prefix = prefix
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.ttl = ttl
+        self.pending_ttl = pending_ttl
+
+    def _meta_key(self, owner_id: int) -> str:
+        return f"{self.prefix}:{owner_id}:meta"
+
+    def _layer_key(self, owner_id: int, layer: int) -> str:
+        return f"{self.prefix}:{owner_id}:{layer}"
+
+    def _pending_key(self, owner_id: int) -> str:
+        return f"{self.prefix}:{owner_id}:pending"
+
+    def _layer_params(self, base_capacity: int, layer: int) -> Tuple[int, int, int]:
+        capacity = base_capacity * 2 ** layer
+        error_rate = self.error_rate / 2 ** (layer + 1)
+        bits = math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2)
+        hashes = max(1, round(bits / capacity * math.log(2)))
+        return capacity, bits, hashes
+
+    @staticmethod
+    def _positions(item: int, bits: int, hashes: int) -> List[int]:
+        digest = hashlib.blake2b(str(item).encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:], 'little') | 1
+        return [(h1 + i * h2) % bits for i in range(hashes)]
+
+    async def _get_meta(self, owner_id: int) -> Optional[Tuple[int, int, int]]:
+        base_capacity, layers, last_count = await self.redis.hmget(
+            self._meta_key(owner_id), 'base_capacity', 'layers', 'last_count'
+        )
+        if base_capacity is None:
+            return None
+        return int(base_capacity), int(layers), int(last_count)
+
+    async def exists(self, owner_id: int) -> bool:
+        return bool(await self.redis.exists(self._meta_key(owner_id)))
+
+    async def rebuild(self, owner_id: int, items: Iterable[int]):
+        items = list(items)
+        base_capacity = max(self.capacity, 2 ** math.ceil(math.log2(max(len(items), 1))))
+        _, bits, hashes = self._layer_params(base_capacity, 0)
+
+        bitmap = np.zeros((bits + 7) // 8, dtype=np.uint8)
+        if items:
+            positions = np.array([p for item in items for p in self._positions(item, bits, hashes)], dtype=np.int64)
+            np.bitwise_or.at(bitmap, positions >> 3, (0x80 >> (positions & 7)).astype(np.uint8))
+
+        meta_key = self._meta_key(owner_id)
+        async with self.redis.pipeline(transaction=True) as pipe:
+            while True:
+                try:
+                    await pipe.watch(meta_key)
+                    layers = await pipe.hget(meta_key, 'layers')
+                    pipe.multi()
+                    pipe.delete(meta_key, *[self._layer_key(owner_id, layer) for layer in range(1, int(layers or 1))])
+                    pipe.set(self._layer_key(owner_id, 0), bitmap.tobytes(), ex=self.ttl)
+                    pipe.hset(meta_key, mapping={
+                        'base_capacity': base_capacity,
+                        'layers': 1,
+                        'last_count': len(items)
+                    })
+                    pipe.expire(meta_key, self.ttl)
+                    await pipe.execute()
+                    break
+                except WatchError:
+                    continue
+
+        async with self.redis.pipeline(transaction=True) as pipe:
+            pipe.smembers(self._pending_key(owner_id))
+            pipe.delete(self._pending_key(owner_id))
+            pending, _ = await pipe.execute()
+        for item in pending:
+            await self.add(owner_id, int(item))
+
+    async def add(self, owner_id: int, item: int):
+        meta_key = self._meta_key(owner_id)
+        async with self.redis.pipeline(transaction=True) as pipe:
+            while True:
+                try:
+                    await pipe.watch(meta_key)
+                    base_capacity, layers, last_count = await pipe.hmget(
+                        meta_key, 'base_capacity', 'layers', 'last_count'
+                    )
+                    if base_capacity is None:
+                        pipe.multi()
+                        pipe.sadd(self._pending_key(owner_id), item)
+                        pipe.expire(self._pending_key(owner_id), self.pending_ttl)
+                        await pipe.execute()
+                        return
+
+                    base_capacity, layers, last_count = int(base_capacity), int(layers), int(last_count)
+                    capacity, _, _ = self._layer_params(base_capacity, layers - 1)
+                    rolled = last_count >= capacity
+                    if rolled:
+                        layers += 1
+
+                    _, bits, hashes = self._layer_params(base_capacity, layers - 1)
+                    layer_key = self._layer_key(owner_id, layers - 1)
+
+                    pipe.multi()
+                    for position in self._positions(item, bits, hashes):
+                        pipe.setbit(layer_key, position, 1)
+                    if rolled:
+                        pipe.hset(meta_key, mapping={'layers': layers, 'last_count': 0})
+                    pipe.hincrby(meta_key, 'last_count', 1)
+                    for layer in range(layers):
+                        pipe.expire(self._layer_key(owner_id, layer), self.ttl)
+                    pipe.expire(meta_key, self.ttl)
+                    await pipe.execute()
+                    return
+                except WatchError:
+                    continue
+
+    async def contains_many(self, owner_id: int, items: List[int]) -> List[bool]:
+        if not items:
+            return []
+
+        meta = await self._get_meta(owner_id)
+        if meta is None:
+            return [False] * len(items)
+
+        base_capacity, layers, _ = meta
+        layer_hashes = []
+        async with self.redis.pipeline(transaction=False) as pipe:
+            for layer in range(layers):
+                _, bits, hashes = self._layer_params(base_capacity, layer)
+                layer_hashes.append(hashes)
+                args = []
+                for item in items:
+                    for position in self._positions(item, bits, hashes):
+                        args.extend(('GET', 'u1', position))
+                pipe.execute_command('BITFIELD', self._layer_key(owner_id, layer), *args)
+            results = await pipe.execute()
+
+        found = np.zeros(len(items), dtype=bool)
+        for hashes, bits_set in zip(layer_hashes, results):
+            found |= np.asarray(bits_set, dtype=np.uint8).reshape(len(items), hashes).all(axis=1)
+        return found.tolist()
+
+    async def clear(self, owner_id: int):
+        meta = await self._get_meta(owner_id)
+        layers = meta[1] if meta else 1
+        await self.redis.delete(
+            self._meta_key(owner_id),
+            self._pending_key(owner_id),
+            *[self._layer_key(owner_id, layer) for layer in range(layers)]
+        )
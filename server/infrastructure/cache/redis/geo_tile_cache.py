@@ -0,0 +1,114 @@
+import math
+import numpy as np
+from redis.asyncio import Redis
+from typing import Dict, Iterable, List, Optional, Tuple
+
+def tile_dtype(dim: int) -> np.dtype:
+    return np.dtype([
+        ('user_id', '<i8'),
+        ('latitude', '<f8'),
+        ('longitude', '<f8'),
+        ('age', '<i2'),
+        ('has_embedding', '?'),
+        ('embedding', '<f4', (dim,))
+    ])
+
+class GeoTileCache:
+    def __init__(
+            self,
+            redis: Redis,
+            tile_size: float = 0.2,
+            age_bucket_size: int = 5,
+            dim: int = 384,
+            ttl: int = 60 * 10
+    ):
+        self.redis = redis
+        self.tile_size = tile_size
+        self.age_bucket_size = age_bucket_size
+        self.dtype = tile_dtype(dim)
+        self.ttl = ttl
+
+    def tile_of(self, latitude: float, longitude: float) -> Tuple[int, int]:
+        return math.floor(latitude / self.tile_size), math.floor(longitude / self.tile_size)
+
+    def tile_bounds(self, tile: Tuple[int, int]) -> Tuple[float, float, float, float]:
+        lat_idx, lon_idx = tile
+        return (
+            lat_idx * self.tile_size,
+            (lat_idx + 1) * self.tile_size,
+            lon_idx * self.tile_size,
+            (lon_idx + 1) * self.tile_size
+        )
+
+    def age_bucket(self, age: int) -> int:
+        return (age or 0) // self.age_bucket_size
+
+    def bucket_bounds(self, bucket: int) -> Tuple[int, int]:
+        return bucket * self.age_bucket_size, (bucket + 1) * self.age_bucket_size - 1
+
+    def key(self, tile: Tuple[int, int], gender: str, bucket: int) -> str:
+        return f"tiles:{self.tile_size}:{tile[0]}:{tile[1]}:{gender}:{bucket}"
+
+    def covering_tiles(
+            self, lat_min: float, lat_max: float, lon_min: float, lon_max: float
+    ) -> List[Tuple[int, int]]:
+        lat_lo, lon_lo = self.tile_of(lat_min, lon_min)
+        lat_hi, lon_hi = self.tile_of(lat_max, lon_max)
+        return [
+            (lat_idx, lon_idx)
+            for lat_idx in range(lat_lo, lat_hi + 1)
+            for lon_idx in range(lon_lo, lon_hi + 1)
+        ]
+
+    def covering_keys(
+            self,
+            tiles: Iterable[Tuple[int, int]],
+            genders: Iterable[str],
+            min_age: int,
+            max_age: int
+    ) -> List[Tuple[str, Tuple[int, int], str, int]]:
+        buckets = range(self.age_bucket(min_age), self.age_bucket(max_age) + 1)
+        return [
+            (self.key(tile, gender, bucket), tile, gender, bucket)
+            for tile in tiles
+            for gender in genders
+            for bucket in buckets
+        ]
+
+    def pack(self, rows: List[dict]) -> bytes:
+        packed = np.zeros(len(rows), dtype=self.dtype)
+        for i, row in enumerate(rows):
+            packed[i]['user_id'] = row['user_id']
+            packed[i]['latitude'] = row['latitude']
+            packed[i]['longitude'] = row['longitude']
+            packed[i]['age'] = row['age'] or 0
+            if row.get('about_embedding') is not None:
+                packed[i]['has_embedding'] = True
+                packed[i]['embedding'] = row['about_embedding']
+        return packed.tobytes()
+
+    def unpack(self, blob: bytes) -> np.ndarray:
+        return np.frombuffer(blob, dtype=self.dtype)
+
+    async def get_many(self, keys: List[str]) -> List[Optional[np.ndarray]]:
+        if not keys:
+            return []
+        blobs = await self.redis.mget(keys)
+        return [self.unpack(blob) if blob is not None else None for blob in blobs]
+
+    async def set_many(self, tiles: Dict[str, bytes]):
+        if not tiles:
+            return
+        async with self.redis.pipeline(transaction=False) as pipe:
+            for key, blob in tiles.items():
+                pipe.set(key, blob, ex=self.ttl)
+            await pipe.execute()
+
+    async def invalidate(self, profile: Optional[dict]):
+        if not profile or profile.get('latitude') is None or profile.get('longitude') is None:
+            return
+        tile = self.tile_of(profile['latitude'], profile['longitude'])
+        await self.redis.delete(self.key(tile, profile['gender'], self.age_bucket(profile['age'])))
+
+    async def close(self):
+        await self.redis.close()
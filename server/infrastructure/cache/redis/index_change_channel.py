@@ -0,0 +1,23 @@
+from redis.asyncio import Redis
+from typing import AsyncIterator
+
+INDEX_CHANGES_CHANNEL = "recs:index:changes"
+
+class IndexChangeChannel:
+    def __init__(self, redis: Redis, channel: str = INDEX_CHANGES_CHANNEL):
+        self.redis = redis
+        self.channel = channel
+
+    async def publish(self, user_id: int):
+        await self.redis.publish(self.channel, user_id)
+
+    async def listen(self) -> AsyncIterator[int]:
+        pubsub = self.redis.pubsub(ignore_subscribe_messages=True)
+        await pubsub.subscribe(self.channel)
+        try:
+            async for message in pubsub.listen():
+                if message['type'] == 'message':
+                    yield int(message['data'])
+        finally:
+            await pubsub.unsubscribe(self.channel)
+            await pubsub.aclose()
@@ -1,29 +1,198 @@
+import asyncio
+import time
+import uuid
 from redis.asyncio import Redis
-from typing import List, Tuple
+from typing import Dict, List, Optional, Tuple
+
+REFILL_QUEUE_KEY = "recs:refill"
+
+RELEASE_LOCK_SCRIPT = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('del', KEYS[1])
+end
+return 0
+"""
 
 def get_recs_key(user_id: int) -> str:
         return f"recs:{user_id}"
 
+def get_recs_dist_key(user_id: int) -> str:
+        return f"recs:{user_id}:dist"
+
+def get_recs_seq_key(user_id: int) -> str:
+        return f"recs:{user_id}:seq"
+
+def get_holders_key(candidate_id: int) -> str:
+        return f"recs:holders:{candidate_id}"
+
+def get_compute_lock_key(user_id: int) -> str:
+        return f"recs:{user_id}:lock"
+
+def get_refill_pending_key(user_id: int) -> str:
+        return f"recs:refill:pending:{user_id}"
+
 class RecommendationCache:
-    def __init__(self, redis: Redis, ttl: int = 60 * 60):
+    def __init__(
+        self,
+        redis: Redis,
+        ttl: int = 60 * 60,
+        refill_lock_ttl: int = 60,
+        compute_lock_ttl: int = 10,
+        holders_ttl: Optional[int] = None
+    ):
         self.redis = redis
         self.ttl = ttl
+        self.holders_ttl = max(holders_ttl or ttl, ttl)
+        self.refill_lock_ttl = refill_lock_ttl
+        self.compute_lock_ttl = compute_lock_ttl
 
-    async def get(self, user_id: int) -> List[Tuple[int, float]]:
-        key = get_recs_key(user_id)
-        results = await self.redis.zrange(key, 0, -1, withscores=True)
-        return [(int(member), score) for member, score in results]
+    async def get(self, user_id: int, limit: int = -1) -> List[Tuple[int, float]]:
+        members = await self.redis.zrange(get_recs_key(user_id), 0, limit - 1 if limit > 0 else -1)
+        if not members:
+            return []
+        distances = await self.redis.hmget(get_recs_dist_key(user_id), members)
+        return [
+            (int(member), float(dist) if dist is not None else 0.0)
+            for member, dist in zip(members, distances)
+        ]
+
+    async def get_page(
+        self, user_id: int, after: Optional[float], limit: int
+    ) -> List[Tuple[int, float, float]]:
+        min_score = f"({after}" if after is not None else "-inf"
+        results = await self.redis.zrangebyscore(
+            get_recs_key(user_id), min_score, "+inf", start=0, num=limit, withscores=True
+        )
+        if not results:
+            return []
+        distances = await self.redis.hmget(get_recs_dist_key(user_id), [member for member, _ in results])
+        return [
+            (int(member), float(dist) if dist is not None else 0.0, score)
+            for (member, score), dist in zip(results, distances)
+        ]
+
+    async def count_after(self, user_id: int, after: Optional[float]) -> int:
+        min_score = f"({after}" if after is not None else "-inf"
+        return await self.redis.zcount(get_recs_key(user_id), min_score, "+inf")
 
     async def set(self, user_id: int, recs: List[Tuple[int, float]]):
-        key = get_recs_key(user_id)
         if not recs:
             return
-        members = {str(uid): float(score) for uid, score in recs}
-        await self.redis.zadd(key, members)
-        await self.redis.expire(key, self.ttl)
+        await self.clear(user_id)
+        await self.push(user_id, recs)
+
+    async def push(self, user_id: int, recs: List[Tuple[int, float]]):
+        if not recs:
+            return
+
+        key = get_recs_key(user_id)
+        dist_key = get_recs_dist_key(user_id)
+        queued = await self.redis.zrange(key, 0, -1)
+        last_score = await self.redis.incrby(get_recs_seq_key(user_id), len(recs))
+        first_score = last_score - len(recs) + 1
+
+        async with self.redis.pipeline(transaction=True) as pipe:
+            pipe.zadd(key, {str(uid): first_score + i for i, (uid, _) in enumerate(recs)}, nx=True)
+            pipe.hset(dist_key, mapping={str(uid): float(dist) for uid, dist in recs})
+            pipe.expire(key, self.ttl)
+            pipe.expire(dist_key, self.ttl)
+            pipe.expire(get_recs_seq_key(user_id), self.ttl * 24)
+            for uid, _ in recs:
+                pipe.sadd(get_holders_key(uid), user_id)
+            for uid in {*map(int, queued), *(uid for uid, _ in recs)}:
+                pipe.expire(get_holders_key(uid), self.holders_ttl)
+            await pipe.execute()
+
+    async def bulk_set(self, recs_by_user: Dict[int, List[Tuple[int, float]]], batch_size: int = 500):
+        users = [user_id for user_id, recs in recs_by_user.items() if recs]
+        for start in range(0, len(users), batch_size):
+            batch = users[start:start + batch_size]
+            async with self.redis.pipeline(transaction=False) as pipe:
+                for user_id in batch:
+                    pipe.incrby(get_recs_seq_key(user_id), len(recs_by_user[user_id]))
+                last_scores = await pipe.execute()
+
+            async with self.redis.pipeline(transaction=False) as pipe:
+                for user_id, last_score in zip(batch, last_scores):
+                    recs = recs_by_user[user_id]
+                    key = get_recs_key(user_id)
+                    dist_key = get_recs_dist_key(user_id)
+                    first_score = last_score - len(recs) + 1
+                    pipe.delete(key, dist_key)
+                    pipe.zadd(key, {str(uid): first_score + i for i, (uid, _) in enumerate(recs)})
+                    pipe.hset(dist_key, mapping={str(uid): float(dist) for uid, dist in recs})
+                    pipe.expire(key, self.ttl)
+                    pipe.expire(dist_key, self.ttl)
+                    pipe.expire(get_recs_seq_key(user_id), self.ttl * 24)
+                    for uid, _ in recs:
+                        pipe.sadd(get_holders_key(uid), user_id)
+                        pipe.expire(get_holders_key(uid), self.holders_ttl)
+                await pipe.execute()
+
+    async def remove(self, user_id: int, candidate_ids: List[int]):
+        if not candidate_ids:
+            return
+        members = [str(uid) for uid in candidate_ids]
+        async with self.redis.pipeline(transaction=True) as pipe:
+            pipe.zrem(get_recs_key(user_id), *members)
+            pipe.hdel(get_recs_dist_key(user_id), *members)
+            await pipe.execute()
+
+    async def trim(self, user_id: int, upto: float):
+        members = await self.redis.zrangebyscore(get_recs_key(user_id), "-inf", upto)
+        if members:
+            async with self.redis.pipeline(transaction=True) as pipe:
+                pipe.zrem(get_recs_key(user_id), *members)
+                pipe.hdel(get_recs_dist_key(user_id), *members)
+                await pipe.execute()
+
+    async def evict_candidate(self, candidate_id: int, batch_size: int = 500):
+        holders_key = get_holders_key(candidate_id)
+        holders = list(await self.redis.smembers(holders_key))
+        member = str(candidate_id)
+        for start in range(0, len(holders), batch_size):
+            async with self.redis.pipeline(transaction=False) as pipe:
+                for owner in holders[start:start + batch_size]:
+                    pipe.zrem(get_recs_key(owner), member)
+                    pipe.hdel(get_recs_dist_key(owner), member)
+                await pipe.execute()
+        await self.redis.delete(holders_key)
+
+    async def size(self, user_id: int) -> int:
+        return await self.redis.zcard(get_recs_key(user_id))
+
+    async def request_refill(self, user_id: int) -> bool:
+        if not await self.redis.set(get_refill_pending_key(user_id), 1, nx=True, ex=self.refill_lock_ttl):
+            return False
+        await self.redis.lpush(REFILL_QUEUE_KEY, user_id)
+        return True
+
+    async def next_refill(self, timeout: int = 5) -> Optional[int]:
+        item = await self.redis.brpop(REFILL_QUEUE_KEY, timeout=timeout)
+        return int(item[1]) if item else None
+
+    async def complete_refill(self, user_id: int):
+        await self.redis.delete(get_refill_pending_key(user_id))
+
+    async def acquire_compute_lock(self, user_id: int) -> Optional[str]:
+        token = uuid.uuid4().hex
+        if await self.redis.set(get_compute_lock_key(user_id), token, nx=True, ex=self.compute_lock_ttl):
+            return token
+        return None
+
+    async def release_compute_lock(self, user_id: int, token: str):
+        await self.redis.eval(RELEASE_LOCK_SCRIPT, 1, get_compute_lock_key(user_id), token)
+
+    async def wait_for_compute(self, user_id: int, poll_interval: float = 0.05) -> bool:
+        deadline = time.monotonic() + self.compute_lock_ttl
+        while time.monotonic() < deadline:
+            if not await self.redis.exists(get_compute_lock_key(user_id)):
+                return True
+            await asyncio.sleep(poll_interval)
+        return False
 
     async def clear(self, user_id: int):
-        await self.redis.delete(get_recs_key(user_id))
-    
+        await self.redis.delete(get_recs_key(user_id), get_recs_dist_key(user_id))
+
     async def close(self):
         await self.redis.close()
@@ -0,0 +1,7 @@
+from redis.asyncio import Redis
+
+from infrastructure.cache.redis.bloom_filter import RedisBloomFilter
+
+class SeenFilter(RedisBloomFilter):
+    def __init__(self, redis: Redis, capacity: int = 1024, error_rate: float = 0.01, ttl: int = 60 * 60 * 24 * 30):
+        super().__init__(redis, prefix="seen", capacity=capacity, error_rate=error_rate, ttl=ttl)
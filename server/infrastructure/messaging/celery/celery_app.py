@@ -1,4 +1,5 @@
 from celery import Celery
+from celery.schedules import crontab
 from kombu import Exchange, Queue
 
 from core.config import get_settings
@@ -12,6 +13,7 @@ celery_app = Celery(
     include=[
         "tasks.location",
         "tasks.video",
+        "tasks.recsys",
     ],
 )
 
@@ -38,13 +40,30 @@ celery_app.conf.update(
         Queue("default", Exchange("default"), routing_key="default"),
         Queue("location", Exchange("location"), routing_key="location.#"),
         Queue("video", Exchange("video"), routing_key="video.#"),
+        Queue("recsys", Exchange("recsys"), routing_key="recsys.#"),
     ],
     task_default_queue='default',
     task_default_exchange='default',
     task_default_routing_key='default',
+
+    beat_schedule={
+        'train-collaborative-factors': {
+            'task': 'recsys.train_collaborative',
+            'schedule': crontab(hour=settings.RECSYS_CF_TRAIN_HOUR, minute=0),
+        },
+        'build-embedding-store': {
+            'task': 'recsys.build_embedding_store',
+            'schedule': crontab(minute=settings.RECSYS_EMBEDDING_STORE_BUILD_MINUTE),
+        },
+        'precompute-recommendations': {
+            'task': 'recsys.precompute_recommendations',
+            'schedule': crontab(hour=settings.RECSYS_PRECOMPUTE_HOUR, minute=0),
+        },
+    },
 )
 
 celery_app.autodiscover_tasks([
     "tasks.location",
     "tasks.video",
+    "tasks.recsys",
 ])
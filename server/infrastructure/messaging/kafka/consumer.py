@@ -1,34 +1,161 @@
 import asyncio
 import json
-from aiokafka import AIOKafkaConsumer
+from aiokafka import AIOKafkaConsumer, ConsumerRebalanceListener, TopicPartition
+from aiokafka.errors import KafkaError
+from typing import Awaitable, Callable, Dict, Iterable, Optional, Set
 
 from core.logger import logger
 
+class CommitOnRebalance(ConsumerRebalanceListener):
+    def __init__(self, consumer: 'KafkaEventConsumer'):
+        self.consumer = consumer
+
+    async def on_partitions_revoked(self, revoked):
+        await self.consumer._commit_offsets(self.consumer._committable(revoked))
+        self.consumer._forget(revoked)
+
+    async def on_partitions_assigned(self, assigned):
+        self.consumer._forget(assigned)
+
 class KafkaEventConsumer:
-    def __init__(self, bootstrap_servers: str, topics: list, callback):
+    def __init__(
+        self,
+        bootstrap_servers: str,
+        topics: list,
+        callback,
+        group_id: Optional[str] = None,
+        auto_offset_reset: str = 'latest',
+        max_concurrency: int = 1,
+        max_retries: int = 0,
+        retry_backoff: float = 0.5,
+        dead_letter: Optional[Callable[[dict], Awaitable[None]]] = None,
+        drain_timeout: float = 10
+    ):
         self.topics = topics
         self.bootstrap_servers = bootstrap_servers
         self.callback = callback
+        self.group_id = group_id
+        self.auto_offset_reset = auto_offset_reset
+        self.max_concurrency = max_concurrency
+        self.max_retries = max_retries
+        self.retry_backoff = retry_backoff
+        self.dead_letter = dead_letter
+        self.drain_timeout = drain_timeout
         self._consumer: AIOKafkaConsumer | None = None
+        self._slots: asyncio.Semaphore | None = None
+        self._loop_task: asyncio.Task | None = None
+        self._tasks: Set[asyncio.Task] = set()
+        self._in_flight: Dict[TopicPartition, Set[int]] = {}
+        self._next_offsets: Dict[TopicPartition, int] = {}
+        self._committed: Dict[TopicPartition, int] = {}
+        self._commit_lock = asyncio.Lock()
+
+    @property
+    def manual_commit(self) -> bool:
+        return self.group_id is not None
 
     async def start(self):
         self._consumer = AIOKafkaConsumer(
-            *self.topics,
             bootstrap_servers=self.bootstrap_servers,
+            group_id=self.group_id,
             value_deserializer=lambda m: json.loads(m.decode('utf-8')),
-            auto_offset_reset='latest'
+            auto_offset_reset=self.auto_offset_reset,
+            enable_auto_commit=not self.manual_commit
+        )
+        self._consumer.subscribe(
+            self.topics, listener=CommitOnRebalance(self) if self.manual_commit else None
         )
         await self._consumer.start()
-        asyncio.create_task(self.consume_loop())
-    
+        self._slots = asyncio.Semaphore(self.max_concurrency)
+        self._loop_task = asyncio.create_task(self.consume_loop())
+
     async def stop(self):
+        if self._loop_task:
+            self._loop_task.cancel()
+            await asyncio.gather(self._loop_task, return_exceptions=True)
+
+        if self._tasks:
+            _, pending = await asyncio.wait(set(self._tasks), timeout=self.drain_timeout)
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+
         if self._consumer:
+            await self._commit()
             await self._consumer.stop()
 
     async def consume_loop(self):
         async for msg in self._consumer:
-            data = msg.value
+            tp = TopicPartition(msg.topic, msg.partition)
+            in_flight = self._in_flight.setdefault(tp, set())
+            in_flight.add(msg.offset)
+            self._committed.setdefault(tp, msg.offset)
+            self._next_offsets[tp] = msg.offset + 1
+
+            if self.max_concurrency == 1:
+                await self._process(in_flight, msg.offset, msg.value)
+            else:
+                await self._slots.acquire()
+                task = asyncio.create_task(self._process(in_flight, msg.offset, msg.value))
+                self._tasks.add(task)
+                task.add_done_callback(self._task_done)
+
+    def _task_done(self, task: asyncio.Task):
+        self._tasks.discard(task)
+        self._slots.release()
+
+    async def _process(self, in_flight: Set[int], offset: int, data: dict):
+        await self.handle(data)
+        in_flight.discard(offset)
+        await self._commit()
+
+    async def handle(self, data: dict):
+        for attempt in range(self.max_retries + 1):
             try:
                 await self.callback(data)
+                return
             except Exception as e:
+                if attempt < self.max_retries:
+                    logger.warning(f"Event handler failed (attempt {attempt + 1}), retrying: {e}")
+                    await asyncio.sleep(self.retry_backoff * 2 ** attempt)
+                    continue
                 logger.error(f"Invalid event: {e}")
+
+        if self.dead_letter is not None:
+            try:
+                await self.dead_letter(data)
+            except Exception as e:
+                logger.error(f"Failed to dead-letter event {data}: {e}")
+
+    def _forget(self, partitions: Iterable[TopicPartition]):
+        for tp in partitions:
+            self._in_flight.pop(tp, None)
+            self._next_offsets.pop(tp, None)
+            self._committed.pop(tp, None)
+
+    async def _commit(self, partitions: Optional[Iterable[TopicPartition]] = None):
+        if not self.manual_commit or self._consumer is None:
+            return
+        async with self._commit_lock:
+            await self._commit_offsets(self._committable(self._consumer.assignment() if partitions is None else partitions))
+
+    def _committable(self, partitions: Iterable[TopicPartition]) -> Dict[TopicPartition, int]:
+        offsets = {}
+        for tp in partitions:
+            next_offset = self._next_offsets.get(tp)
+            if next_offset is None:
+                continue
+            in_flight = self._in_flight.get(tp)
+            offset = min(in_flight) if in_flight else next_offset
+            if offset > self._committed.get(tp, -1):
+                offsets[tp] = offset
+        return offsets
+
+    async def _commit_offsets(self, offsets: Dict[TopicPartition, int]):
+        if not offsets:
+            return
+        try:
+            await self._consumer.commit(offsets)
+            self._committed.update(offsets)
+        except KafkaError as e:
+            logger.warning(f"Offset commit failed, events will be redelivered: {e}")
@@ -0,0 +1,199 @@
+import asyncio
+import multiprocessing
+import time
+import asyncpg
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Tuple
+from redis.asyncio import Redis
+
+from core.config import Settings
+from infrastructure.cache.redis.recommendation_cache import RecommendationCache
+from recsys.density_grid import DensityGrid
+from recsys.geo import bounding_box, haversine_m
+from recsys.scoring import normalize
+from recsys.vector_index import GENDER_CODES
+from shared.utils.embedding_codec import decode_embedding
+from shared.utils.age import get_match_age_range
+
+_DATA: Dict[str, np.ndarray] = {}
+
+async def export_profiles(dsn: str) -> Dict[str, np.ndarray]:
+    conn = await asyncpg.connect(dsn=dsn)
+    try:
+        profiles = await conn.fetch("""
+            SELECT user_id, about_embedding, about_embedding_packed, latitude, longitude,
+                gender::text AS gender, interesting_gender::text AS interesting_gender, age
+            FROM profiles
+            WHERE is_active = TRUE
+            AND location IS NOT NULL
+            AND (about_embedding_packed IS NOT NULL OR about_embedding IS NOT NULL)
+            ORDER BY user_id
+        """)
+        swipes = await conn.fetch("""
+            SELECT from_user_id, to_user_id FROM swipes ORDER BY from_user_id
+        """)
+    finally:
+        await conn.close()
+
+    n = len(profiles)
+    ids = np.fromiter((p['user_id'] for p in profiles), dtype=np.int64, count=n)
+    vectors = normalize(np.stack([
+        decode_embedding(p['about_embedding_packed']) if p['about_embedding_packed'] is not None
+        else np.asarray(p['about_embedding'], dtype=np.float32)
+        for p in profiles
+    ])) if n else np.zeros((0, 0), dtype=np.float32)
+    ages = np.fromiter((p['age'] or 0 for p in profiles), dtype=np.int16, count=n)
+    age_ranges = np.array([get_match_age_range(int(age)) if 12 <= age <= 100 else (0, -1) for age in ages], dtype=np.int16).reshape(-1, 2)
+
+    from_ids = np.fromiter((s['from_user_id'] for s in swipes), dtype=np.int64, count=len(swipes))
+    to_ids = np.fromiter((s['to_user_id'] for s in swipes), dtype=np.int64, count=len(swipes))
+    owner_rows = np.searchsorted(ids, from_ids)
+    known = (owner_rows < n) & (ids[np.minimum(owner_rows, max(n - 1, 0))] == from_ids) if n else np.zeros(0, dtype=bool)
+
+    return {
+        'ids': ids,
+        'vectors': vectors,
+        'lat': np.fromiter((p['latitude'] for p in profiles), dtype=np.float64, count=n),
+        'lon': np.fromiter((p['longitude'] for p in profiles), dtype=np.float64, count=n),
+        'gender': np.array([GENDER_CODES.get(p['gender'], -1) for p in profiles], dtype=np.int8),
+        'interest': np.array([GENDER_CODES.get(p['interesting_gender'], -1) for p in profiles], dtype=np.int8),
+        'age': ages,
+        'min_age': age_ranges[:, 0],
+        'max_age': age_ranges[:, 1],
+        'swipe_offsets': np.searchsorted(owner_rows[known], np.arange(n + 1)),
+        'swipe_targets': to_ids[known]
+    }
+
+def partition_by_tile(data: Dict[str, np.ndarray], tile_size: float) -> List[np.ndarray]:
+    tiles = np.stack([np.floor(data['lat'] / tile_size), np.floor(data['lon'] / tile_size)], axis=1)
+    _, inverse = np.unique(tiles, axis=0, return_inverse=True)
+    inverse = inverse.reshape(-1)
+    order = np.argsort(inverse, kind='stable')
+    bounds = np.searchsorted(inverse[order], np.arange(inverse.max() + 2)) if inverse.size else [0]
+    return [order[bounds[i]:bounds[i + 1]] for i in range(len(bounds) - 1)]
+
+def candidate_rows(data: Dict[str, np.ndarray], lat_order: np.ndarray, query_rows: np.ndarray, radius_km: float) -> np.ndarray:
+    lat = float(data['lat'][query_rows].mean())
+    lon = float(data['lon'][query_rows].mean())
+    spread_km = float(haversine_m(lat, lon, data['lat'][query_rows], data['lon'][query_rows]).max()) / 1000
+    lat_min, lat_max, lon_min, lon_max = bounding_box(lat, lon, radius_km + spread_km)
+
+    sorted_lat = data['lat'][lat_order]
+    rows = lat_order[np.searchsorted(sorted_lat, lat_min):np.searchsorted(sorted_lat, lat_max, side='right')]
+    rows = rows[(data['lon'][rows] >= lon_min) & (data['lon'][rows] <= lon_max)]
+    return np.sort(rows)
+
+def _score_partition(
+        query_rows: np.ndarray, rows: np.ndarray, radius_m: float, top_n: int, block_size: int
+) -> List[Tuple[int, np.ndarray, np.ndarray]]:
+    data = _DATA
+    candidate_ids = data['ids'][rows]
+    candidate_vectors = data['vectors'][rows]
+    candidate_lat = data['lat'][rows][None, :]
+    candidate_lon = data['lon'][rows][None, :]
+    candidate_gender = data['gender'][rows][None, :]
+    candidate_age = data['age'][rows][None, :]
+
+    results = []
+    for start in range(0, query_rows.shape[0], block_size):
+        block = query_rows[start:start + block_size]
+        scores = data['vectors'][block] @ candidate_vectors.T
+        distances = haversine_m(data['lat'][block][:, None], data['lon'][block][:, None], candidate_lat, candidate_lon)
+
+        interest = data['interest'][block][:, None]
+        mask = distances <= radius_m
+        mask &= (interest < 0) | (candidate_gender == interest)
+        mask &= (candidate_age >= data['min_age'][block][:, None]) & (candidate_age <= data['max_age'][block][:, None])
+        mask &= candidate_ids[None, :] != data['ids'][block][:, None]
+        for i, row in enumerate(block):
+            swiped = data['swipe_targets'][data['swipe_offsets'][row]:data['swipe_offsets'][row + 1]]
+            cols = np.searchsorted(candidate_ids, swiped)
+            valid = cols < candidate_ids.shape[0]
+            cols = cols[valid][candidate_ids[cols[valid]] == swiped[valid]]
+            mask[i, cols] = False
+        scores = np.where(mask, scores, -np.inf)
+
+        k = min(top_n, scores.shape[1])
+        if k == 0:
+            continue
+        top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        top_scores = np.take_along_axis(scores, top, axis=1)
+        order = np.argsort(-top_scores, axis=1, kind='stable')
+        top = np.take_along_axis(top, order, axis=1)
+        top_scores = np.take_along_axis(top_scores, order, axis=1)
+
+        for i, row in enumerate(block):
+            keep = top[i][np.isfinite(top_scores[i])]
+            if keep.size:
+                results.append((int(data['ids'][row]), candidate_ids[keep], distances[i, keep].astype(np.float32)))
+    return results
+
+def _radius_for_partition(data: Dict[str, np.ndarray], query_rows: np.ndarray, grid: DensityGrid, default_km: float) -> float:
+    if grid is None:
+        return default_km
+    return grid.radius_for(float(data['lat'][query_rows].mean()), float(data['lon'][query_rows].mean()), list(GENDER_CODES))
+
+def _build_density_grid(data: Dict[str, np.ndarray], settings: Settings) -> DensityGrid:
+    grid = DensityGrid(
+        cell_size=settings.RECSYS_DENSITY_CELL_DEG,
+        target_candidates=settings.RECSYS_RADIUS_TARGET_CANDIDATES,
+        min_radius_km=settings.RECSYS_RADIUS_MIN_KM,
+        max_radius_km=settings.RECSYS_RADIUS_MAX_KM,
+        radius_step_km=settings.RECSYS_RADIUS_STEP_KM
+    )
+    cells = np.stack([
+        np.floor(data['lat'] / grid.cell_size),
+        np.floor(data['lon'] / grid.cell_size),
+        data['gender']
+    ], axis=1).astype(np.int64)
+    unique, counts = np.unique(cells, axis=0, return_counts=True)
+    names = {code: name for name, code in GENDER_CODES.items()}
+    grid.build((int(lat), int(lon), names.get(int(g), ''), int(c)) for (lat, lon, g), c in zip(unique, counts))
+    return grid
+
+async def precompute_recommendations(settings: Settings, workers: int, block_size: int, top_n: int) -> Dict[str, float]:
+    global _DATA
+    started = time.perf_counter()
+    data = await export_profiles(settings.postgres_dsn)
+    exported = time.perf_counter()
+
+    grid = _build_density_grid(data, settings) if settings.RECSYS_ADAPTIVE_RADIUS_ENABLED else None
+    partitions = partition_by_tile(data, settings.RECSYS_PRECOMPUTE_TILE_DEG) if data['ids'].size else []
+    lat_order = np.argsort(data['lat'], kind='stable')
+    jobs = []
+    for query_rows in partitions:
+        radius_km = _radius_for_partition(data, query_rows, grid, settings.RECSYS_MAX_DISTANCE_KM)
+        rows = candidate_rows(data, lat_order, query_rows, radius_km)
+        jobs.append((query_rows, rows, radius_km * 1000))
+
+    _DATA = data
+    results: Dict[int, List[Tuple[int, float]]] = {}
+    context = multiprocessing.get_context('fork')
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context) as pool:
+        futures = [pool.submit(_score_partition, q, r, radius, top_n, block_size) for q, r, radius in jobs]
+        for future in futures:
+            for user_id, ids, distances in future.result():
+                results[user_id] = list(zip(ids.tolist(), distances.tolist()))
+    computed = time.perf_counter()
+
+    redis = Redis.from_url(settings.redis_url_cache, decode_responses=True)
+    try:
+        await RecommendationCache(redis, ttl=settings.RECSYS_PRECOMPUTE_TTL).bulk_set(results)
+    finally:
+        await redis.close()
+    finished = time.perf_counter()
+
+    users = int(data['ids'].shape[0])
+    return {
+        'users': users,
+        'users_with_recs': len(results),
+        'partitions': len(jobs),
+        'export_seconds': round(exported - started, 2),
+        'compute_seconds': round(computed - exported, 2),
+        'load_seconds': round(finished - computed, 2),
+        'users_per_second': round(users / max(finished - started, 1e-9), 1)
+    }
+
+def run(settings: Settings, workers: int, block_size: int, top_n: int) -> Dict[str, float]:
+    return asyncio.run(precompute_recommendations(settings, workers, block_size, top_n))
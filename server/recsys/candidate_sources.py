@@ -0,0 +1,20 @@
+import asyncio
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, List, Optional, Tuple
+
+@dataclass
+class CandidateContext:
+    user_id: int
+    user: dict
+    min_age: int
+    max_age: int
+    radius: float
+    exclude: List[int] = field(default_factory=list)
+    tiles: Optional[asyncio.Future] = field(default=None, repr=False)
+
+@dataclass
+class CandidateSource:
+    name: str
+    fetch: Callable[[CandidateContext, int], Awaitable[List[Tuple[int, float]]]]
+    share: float
+    timeout: float
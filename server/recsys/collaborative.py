@@ -0,0 +1,124 @@
+import os
+import time
+import numpy as np
+from typing import Optional, Tuple
+
+FACTORS_MAGIC = 0x43464631
+HEADER_SIZE = 4
+
+def train_factors(
+        rows: np.ndarray,
+        cols: np.ndarray,
+        values: np.ndarray,
+        n_rows: int,
+        n_cols: int,
+        dim: int = 32,
+        epochs: int = 10,
+        reg: float = 0.1,
+        seed: int = 0
+) -> Tuple[np.ndarray, np.ndarray]:
+    rng = np.random.default_rng(seed)
+    row_factors = rng.normal(0, 0.1, (n_rows, dim)).astype(np.float32)
+    col_factors = rng.normal(0, 0.1, (n_cols, dim)).astype(np.float32)
+    values = values.astype(np.float32)
+
+    for _ in range(epochs):
+        row_factors = _solve_side(rows, cols, values, col_factors, n_rows, reg)
+        col_factors = _solve_side(cols, rows, values, row_factors, n_cols, reg)
+    return row_factors, col_factors
+
+def _solve_side(
+        index: np.ndarray, other: np.ndarray, values: np.ndarray, fixed: np.ndarray, n: int, reg: float
+) -> np.ndarray:
+    dim = fixed.shape[1]
+    order = np.argsort(index, kind='stable')
+    bounds = np.searchsorted(index[order], np.arange(n + 1))
+    regularizer = reg * np.eye(dim, dtype=np.float32)
+
+    solved = np.zeros((n, dim), dtype=np.float32)
+    for i in range(n):
+        observed = order[bounds[i]:bounds[i + 1]]
+        if observed.size == 0:
+            continue
+        factors = fixed[other[observed]]
+        gram = factors.T @ factors + regularizer * observed.size
+        solved[i] = np.linalg.solve(gram, factors.T @ values[observed])
+    return solved
+
+def save_factors(
+        path: str,
+        user_ids: np.ndarray,
+        user_factors: np.ndarray,
+        item_ids: np.ndarray,
+        item_factors: np.ndarray
+):
+    user_order = np.argsort(user_ids)
+    item_order = np.argsort(item_ids)
+    header = np.array([FACTORS_MAGIC, user_ids.shape[0], item_ids.shape[0], user_factors.shape[1]], dtype=np.int64)
+
+    tmp_path = f"{path}.tmp"
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(tmp_path, 'wb') as f:
+        f.write(header.tobytes())
+        f.write(np.ascontiguousarray(user_ids[user_order], dtype=np.int64).tobytes())
+        f.write(np.ascontiguousarray(item_ids[item_order], dtype=np.int64).tobytes())
+        f.write(np.ascontiguousarray(user_factors[user_order], dtype=np.float32).tobytes())
+        f.write(np.ascontiguousarray(item_factors[item_order], dtype=np.float32).tobytes())
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+class CollaborativeModel:
+    def __init__(self, path: str):
+        header = np.fromfile(path, dtype=np.int64, count=HEADER_SIZE)
+        if header.shape[0] != HEADER_SIZE or header[0] != FACTORS_MAGIC:
+            raise ValueError(f"{path} is not a collaborative factors file")
+
+        _, n_users, n_items, dim = (int(v) for v in header)
+        offset = header.nbytes
+        self.user_ids = np.memmap(path, dtype=np.int64, mode='r', offset=offset, shape=(n_users,))
+        offset += n_users * 8
+        self.item_ids = np.memmap(path, dtype=np.int64, mode='r', offset=offset, shape=(n_items,))
+        offset += n_items * 8
+        self.user_factors = np.memmap(path, dtype=np.float32, mode='r', offset=offset, shape=(n_users, dim))
+        offset += n_users * dim * 4
+        self.item_factors = np.memmap(path, dtype=np.float32, mode='r', offset=offset, shape=(n_items, dim))
+
+    @staticmethod
+    def _lookup(ids: np.ndarray, query: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        if ids.shape[0] == 0:
+            return np.zeros(query.shape[0], dtype=np.int64), np.zeros(query.shape[0], dtype=bool)
+        rows = np.clip(np.searchsorted(ids, query), 0, ids.shape[0] - 1)
+        return rows, ids[rows] == query
+
+    def user_vector(self, user_id: int) -> Optional[np.ndarray]:
+        rows, known = self._lookup(self.user_ids, np.array([user_id], dtype=np.int64))
+        return np.asarray(self.user_factors[rows[0]]) if known[0] else None
+
+    def score(self, user_vector: np.ndarray, candidate_ids: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        rows, known = self._lookup(self.item_ids, np.asarray(candidate_ids, dtype=np.int64))
+        scores = np.asarray(self.item_factors[rows]) @ user_vector
+        return np.where(known, scores, 0.0), known
+
+class CollaborativeModelStore:
+    def __init__(self, path: str, reload_interval: float = 60):
+        self.path = path
+        self.reload_interval = reload_interval
+        self._model: Optional[CollaborativeModel] = None
+        self._mtime: Optional[float] = None
+        self._checked_at = 0.0
+
+    def current(self) -> Optional[CollaborativeModel]:
+        now = time.monotonic()
+        if now - self._checked_at < self.reload_interval and self._checked_at:
+            return self._model
+        self._checked_at = now
+
+        try:
+            mtime = os.stat(self.path).st_mtime
+        except FileNotFoundError:
+            return self._model
+        if mtime != self._mtime:
+            self._model = CollaborativeModel(self.path)
+            self._mtime = mtime
+        return self._model
@@ -0,0 +1,41 @@
+import time
+import asyncpg
+import numpy as np
+from typing import Dict
+
+from recsys.collaborative import save_factors, train_factors
+
+SWIPE_VALUES = {'like': 1.0, 'question': 1.0, 'dislike': -1.0}
+
+async def load_swipes(dsn: str):
+    conn = await asyncpg.connect(dsn=dsn)
+    try:
+        records = await conn.fetch("""
+            SELECT from_user_id, to_user_id, action::text AS action
+            FROM swipes
+        """)
+    finally:
+        await conn.close()
+
+    from_ids = np.fromiter((r['from_user_id'] for r in records), dtype=np.int64, count=len(records))
+    to_ids = np.fromiter((r['to_user_id'] for r in records), dtype=np.int64, count=len(records))
+    values = np.fromiter((SWIPE_VALUES.get(r['action'], 0.0) for r in records), dtype=np.float32, count=len(records))
+    return from_ids, to_ids, values
+
+async def train_collaborative(dsn: str, path: str, dim: int, epochs: int, reg: float) -> Dict[str, float]:
+    started = time.perf_counter()
+    from_ids, to_ids, values = await load_swipes(dsn)
+
+    user_ids, rows = np.unique(from_ids, return_inverse=True)
+    item_ids, cols = np.unique(to_ids, return_inverse=True)
+    user_factors, item_factors = train_factors(
+        rows, cols, values, user_ids.shape[0], item_ids.shape[0], dim=dim, epochs=epochs, reg=reg
+    )
+    save_factors(path, user_ids, user_factors, item_ids, item_factors)
+
+    return {
+        'swipes': int(values.shape[0]),
+        'users': int(user_ids.shape[0]),
+        'items': int(item_ids.shape[0]),
+        'seconds': round(time.perf_counter() - started, 2)
+    }
@@ -0,0 +1,107 @@
+import time
+import numpy as np
+from typing import Iterable, List, Optional, Tuple
+
+from recsys.geo import bounding_box, haversine_m
+from recsys.vector_index import GENDER_CODES
+
+class DensityGrid:
+    def __init__(
+            self,
+            cell_size: float = 0.1,
+            target_candidates: int = 1000,
+            min_radius_km: float = 2,
+            max_radius_km: float = 100,
+            radius_step_km: float = 2
+    ):
+        self.cell_size = cell_size
+        self.target_candidates = target_candidates
+        self.min_radius_km = min_radius_km
+        self.max_radius_km = max_radius_km
+        self.radius_step_km = radius_step_km
+        self.loaded_at: Optional[float] = None
+        self._lat_idx = np.zeros(0, dtype=np.int64)
+        self._lon_idx = np.zeros(0, dtype=np.int64)
+        self._lat = np.zeros(0, dtype=np.float64)
+        self._lon = np.zeros(0, dtype=np.float64)
+        self._counts = np.zeros((0, len(GENDER_CODES)), dtype=np.int64)
+        self._bands = np.zeros(0, dtype=np.int64)
+        self._band_starts = np.zeros(1, dtype=np.int64)
+
+    @property
+    def is_loaded(self) -> bool:
+        return self.loaded_at is not None
+
+    def is_stale(self, max_age: float) -> bool:
+        return self.loaded_at is None or time.monotonic() - self.loaded_at > max_age
+
+    def build(self, cells: Iterable[Tuple[int, int, str, int]]):
+        index = {}
+        counts: List[List[int]] = []
+        for lat_idx, lon_idx, gender, count in cells:
+            if gender not in GENDER_CODES:
+                continue
+            row = index.setdefault((lat_idx, lon_idx), len(counts))
+            if row == len(counts):
+                counts.append([0] * len(GENDER_CODES))
+            counts[row][GENDER_CODES[gender]] += count
+
+        keys = np.array(list(index.keys()), dtype=np.int64).reshape(-1, 2)
+        order = np.lexsort((keys[:, 1], keys[:, 0]))
+        self._lat_idx = keys[order, 0]
+        self._lon_idx = keys[order, 1]
+        self._lat = (self._lat_idx + 0.5) * self.cell_size
+        self._lon = (self._lon_idx + 0.5) * self.cell_size
+        self._counts = np.array(counts, dtype=np.int64).reshape(-1, len(GENDER_CODES))[order]
+        self._bands, starts = np.unique(self._lat_idx, return_index=True)
+        self._band_starts = np.append(starts, self._lat_idx.shape[0])
+        self.loaded_at = time.monotonic()
+
+    def _cells_within(self, latitude: float, longitude: float, radius_km: float) -> np.ndarray:
+        lat_min, lat_max, lon_min, lon_max = bounding_box(latitude, longitude, radius_km)
+        if lon_max - lon_min >= 360:
+            lon_ranges = [(-180.0, 180.0)]
+        elif lon_min < -180:
+            lon_ranges = [(lon_min + 360, 180.0), (-180.0, lon_max)]
+        elif lon_max > 180:
+            lon_ranges = [(lon_min, 180.0), (-180.0, lon_max - 360)]
+        else:
+            lon_ranges = [(lon_min, lon_max)]
+        lon_ranges = [(np.floor(lo / self.cell_size), np.floor(hi / self.cell_size)) for lo, hi in lon_ranges]
+
+        first = np.searchsorted(self._bands, np.floor(lat_min / self.cell_size))
+        last = np.searchsorted(self._bands, np.floor(lat_max / self.cell_size), side='right')
+        cells = []
+        for band in range(first, last):
+            start, stop = self._band_starts[band], self._band_starts[band + 1]
+            lon_idx = self._lon_idx[start:stop]
+            for lo, hi in lon_ranges:
+                cells.append(np.arange(
+                    start + np.searchsorted(lon_idx, lo), start + np.searchsorted(lon_idx, hi, side='right')
+                ))
+        return np.concatenate(cells) if cells else np.zeros(0, dtype=np.int64)
+
+    def radius_for(self, latitude: float, longitude: float, genders: List[str]) -> float:
+        """Smallest ring radius whose cells hold target_candidates profiles of the given genders.
+
+        Cells are counted by their centre, so boundary cells straddling the ring are taken whole
+        on one side or the other. The counts are per gender only: the age filter applied later
+        is ignored, so narrow age ranges can see fewer candidates than the target.
+        """
+        cells = self._cells_within(latitude, longitude, self.max_radius_km)
+        if cells.shape[0] == 0:
+            return self.max_radius_km
+
+        codes = [GENDER_CODES[g] for g in genders if g in GENDER_CODES]
+        counts = self._counts[cells][:, codes].sum(axis=1)
+        distances = haversine_m(latitude, longitude, self._lat[cells], self._lon[cells]) / 1000
+        within = distances <= self.max_radius_km
+        rings = np.ceil(distances[within] / self.radius_step_km).astype(np.int64)
+        cumulative = np.cumsum(np.bincount(rings, weights=counts[within]))
+
+        reached = np.searchsorted(cumulative, self.target_candidates)
+        if reached >= cumulative.shape[0]:
+            return self.max_radius_km
+
+        radius = reached * self.radius_step_km
+        return float(min(max(radius, self.min_radius_km), self.max_radius_km))
@@ -0,0 +1,29 @@
+from typing import Optional
+
+DEFAULT_MODEL_NAME = 'all-MiniLM-L6-v2'
+DEFAULT_QUANTIZED_ONNX_FILE = 'onnx/model_quint8_avx2.onnx'
+EMBEDDING_BACKENDS = ('torch', 'onnx', 'onnx-int8')
+
+def load_embedding_model(
+        backend: str = 'torch',
+        model_name: str = DEFAULT_MODEL_NAME,
+        onnx_file: Optional[str] = None
+):
+    from sentence_transformers import SentenceTransformer
+
+    if backend == 'torch':
+        return SentenceTransformer(model_name, device='cpu')
+
+    if backend == 'onnx':
+        model_kwargs = {'file_name': onnx_file} if onnx_file else None
+        return SentenceTransformer(model_name, device='cpu', backend='onnx', model_kwargs=model_kwargs)
+
+    if backend == 'onnx-int8':
+        return SentenceTransformer(
+            model_name,
+            device='cpu',
+            backend='onnx',
+            model_kwargs={'file_name': onnx_file or DEFAULT_QUANTIZED_ONNX_FILE}
+        )
+
+    raise ValueError(f"Unknown embedding backend: {backend}. Expected one of {EMBEDDING_BACKENDS}")
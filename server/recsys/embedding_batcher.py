@@ -0,0 +1,81 @@
+import asyncio
+import time
+import numpy as np
+from typing import Awaitable, Callable, List, Optional, Tuple
+
+from core.logger import logger
+from core.metrics import EMBEDDING_BATCH_SIZE, EMBEDDING_QUEUE_WAIT_SECONDS
+
+PendingItem = Tuple[int, str, asyncio.Future, float]
+
+class EmbeddingBatcher:
+    def __init__(
+            self,
+            embed: Callable[[List[str]], Awaitable[np.ndarray]],
+            write: Callable[[List[Tuple[int, np.ndarray]]], Awaitable[None]],
+            max_batch_size: int = 32,
+            max_wait_ms: float = 10,
+            max_queue_size: int = 256,
+            workers: int = 1
+    ):
+        self.embed = embed
+        self.write = write
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self.max_queue_size = max_queue_size
+        self.workers = workers
+        self._queue: Optional[asyncio.Queue] = None
+        self._workers: List[asyncio.Task] = []
+
+    async def submit(self, user_id: int, text: str) -> np.ndarray:
+        self._ensure_worker()
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((user_id, text, future, time.perf_counter()))
+        return await future
+
+    def _ensure_worker(self):
+        self._queue = self._queue or asyncio.Queue(maxsize=self.max_queue_size)
+        self._workers = [worker for worker in self._workers if not worker.done()]
+        while len(self._workers) < self.workers:
+            self._workers.append(asyncio.create_task(self._run()))
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            deadline = loop.time() + self.max_wait
+
+            while len(batch) < self.max_batch_size:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+
+            await self._flush(batch)
+
+    async def _flush(self, batch: List[PendingItem]):
+        started = time.perf_counter()
+        EMBEDDING_BATCH_SIZE.observe(len(batch))
+        for _, _, _, enqueued in batch:
+            EMBEDDING_QUEUE_WAIT_SECONDS.observe(started - enqueued)
+
+        latest = {user_id: text for user_id, text, _, _ in batch}
+        user_ids = list(latest)
+
+        try:
+            embeddings = await self.embed([latest[user_id] for user_id in user_ids])
+            await self.write(list(zip(user_ids, embeddings)))
+        except Exception as e:
+            logger.error(f"Embedding batch of {len(batch)} failed: {e}")
+            for _, _, future, _ in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        by_user = dict(zip(user_ids, embeddings))
+        for user_id, _, future, _ in batch:
+            if not future.done():
+                future.set_result(by_user[user_id])
@@ -1,17 +1,27 @@
+import asyncio
+import time
 import numpy as np
-import random
-import re
-import pymorphy2
-from sentence_transformers import SentenceTransformer
-from sklearn.metrics.pairwise import cosine_similarity
-from typing import List, Tuple
-from nltk.stem import WordNetLemmatizer
-from langdetect import detect
-from math import radians, sin, cos, sqrt, atan2
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
 
 from domain.profile.repositories.profile_repository import ProfileRepository
+from domain.swipe.repositories.swipe_repository import SwipeRepository
 from infrastructure.cache.redis.recommendation_cache import RecommendationCache
-from infrastructure.cache.redis.swipe_cache import SwipeCache
+from infrastructure.cache.redis.seen_filter import SeenFilter
+from infrastructure.cache.redis.inbound_likes_filter import InboundLikesFilter
+from infrastructure.cache.redis.index_change_channel import IndexChangeChannel
+from core.logger import logger
+from core.metrics import RECSYS_SOURCE_SKIPPED, RECSYS_STAGE_SECONDS
+from recsys.candidate_sources import CandidateContext, CandidateSource
+from recsys.collaborative import CollaborativeModelStore
+from recsys.density_grid import DensityGrid
+from recsys.embedding_batcher import EmbeddingBatcher
+from recsys.embedding_store import SharedEmbeddingStore
+from recsys.inference_executor import InferenceExecutor
+from recsys.model_registry import get_embedding_model
+from recsys.text_normalizer import TextNormalizer
+from recsys.scoring import normalize, stack_embeddings, cosine_top_k, top_k, mmr_rerank
+from recsys.tile_candidates import TileCandidateLoader
+from recsys.vector_index import IVFVectorIndex
 from shared.utils.age import get_match_age_range
 
 class EmbeddingRecommender:
@@ -19,166 +29,521 @@ class EmbeddingRecommender:
             self, 
             profile_repo: ProfileRepository, 
             recommendation_cache: RecommendationCache,
-            swipe_cache: SwipeCache,
+            seen_filter: SeenFilter,
+            swipe_repo: SwipeRepository = None,
+            inbound_likes: InboundLikesFilter = None,
             embedding_size = 384, 
             recsys_coeff = 0.7, 
             stop_words = [], 
             max_distance_search = 20, 
-            model = None
+            index_overfetch = 4,
+            queue_size = 100,
+            queue_low_watermark = 20,
+            model = None,
+            model_factory: Callable = get_embedding_model,
+            index: IVFVectorIndex = None,
+            index_changes: IndexChangeChannel = None,
+            embedding_store: SharedEmbeddingStore = None,
+            index_refresh_interval = 60 * 10,
+            inference: InferenceExecutor = None,
+            embedding_batch_size = 32,
+            embedding_batch_wait_ms = 10,
+            embedding_queue_size = 256,
+            text_normalizer: TextNormalizer = None,
+            tile_loader: TileCandidateLoader = None,
+            density_grid: DensityGrid = None,
+            density_refresh_interval = 60 * 60,
+            embedding_source_timeout = 0.5,
+            random_source_timeout = 0.3,
+            collaborative: CollaborativeModelStore = None,
+            collaborative_share = 0.2,
+            collaborative_source_timeout = 0.3,
+            mmr_pool_factor = 3,
+            mmr_relevance_weight = 1.0,
+            mmr_diversity_weight = 0.3,
+            mmr_distance_weight = 0.1
     ):
-        self.model = model or SentenceTransformer('all-MiniLM-L6-v2')
+        self._model = model
+        self.model_factory = model_factory
         self.profile_repo = profile_repo
         self.recommendation_cache = recommendation_cache
-        self.swipe_cache = swipe_cache
+        self.seen_filter = seen_filter
+        self.swipe_repo = swipe_repo
+        self.inbound_likes = inbound_likes
         self.embedding_size = embedding_size
         self.recsys_coeff = recsys_coeff
-        self.stop_words = stop_words
+        self.text_normalizer = text_normalizer or TextNormalizer(stop_words)
         self.max_distance_search = max_distance_search
-        self.lemmatizer = WordNetLemmatizer()
-        self.morph = pymorphy2.MorphAnalyzer()
+        self.index = index
+        self.index_changes = index_changes
+        self.embedding_store = embedding_store
+        self.tile_loader = tile_loader
+        self.collaborative = collaborative
+        self.mmr_pool_factor = mmr_pool_factor
+        self.mmr_relevance_weight = mmr_relevance_weight
+        self.mmr_diversity_weight = mmr_diversity_weight
+        self.mmr_distance_weight = mmr_distance_weight
+        self.density_grid = density_grid
+        self.density_refresh_interval = density_refresh_interval
+        self._density_lock = asyncio.Lock()
+        self._density_refresh_task: asyncio.Task = None
+        self.index_overfetch = index_overfetch
+        self.queue_size = queue_size
+        self.queue_low_watermark = queue_low_watermark
+        self.index_refresh_interval = index_refresh_interval
+        self._index_lock = asyncio.Lock()
+        self._index_refresh_task: asyncio.Task = None
+        self._index_journal: Optional[List[Callable[[IVFVectorIndex], object]]] = None
+        self.inference = inference or InferenceExecutor()
+        self.embedding_batcher = EmbeddingBatcher(
+            embed=lambda texts: self.inference.run(self.embed_texts, texts),
+            write=lambda embeddings: self.profile_repo.update_embeddings(embeddings),
+            max_batch_size=embedding_batch_size,
+            max_wait_ms=embedding_batch_wait_ms,
+            max_queue_size=embedding_queue_size,
+            workers=self.inference.max_workers
+        )
+        self._cold_fills: Dict[int, asyncio.Task] = {}
+        self.sources: List[CandidateSource] = []
+        self.register_source(CandidateSource(
+            'embedding', self._get_similar_profiles_by_embedding, recsys_coeff, embedding_source_timeout
+        ))
+        self.register_source(CandidateSource(
+            'random', self._get_random_profiles_by_criteria, 1 - recsys_coeff, random_source_timeout
+        ))
+        if collaborative is not None:
+            self.register_source(CandidateSource(
+                'collaborative', self._get_collaborative_profiles, collaborative_share, collaborative_source_timeout
+            ))
 
-    @staticmethod
-    def calculate_distance(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
-        lat1, lon1, lat2, lon2 = map(radians, [lat1, lon1, lat2, lon2])
-        dlat = lat2 - lat1
-        dlon = lon2 - lon1
-        a = sin(dlat / 2) ** 2 + cos(lat1) * cos(lat2) * sin(dlon / 2) ** 2
-        c = 2 * atan2(sqrt(a), sqrt(1 - a))
-        return 6371 * c
-
-    async def _preprocess_text(self, text: str) -> str:
-        text = text.lower()
-        text = re.sub(r'<[^>]+>', '', text)
-        text = re.sub(r'[^a-zа-яё0-9\s]', ' ', text)
-        text = re.sub(r'\s+', ' ', text).strip()
-
-        lang = detect(text)
-
-        words = text.split()
-
-        lemmas = []
-        for word in words:
-            if word not in self.stop_words and len(word) > 2:
-                if lang == 'ru':
-                    lemmas.append(self.morph.parse(word)[0].normal_form)
-                elif lang == 'en':
-                    lemmas.append(self.lemmatizer.lemmatize(word))
+    def register_source(self, source: CandidateSource):
+        self.sources.append(source)
+
+    @property
+    def model(self):
+        if self._model is None:
+            self._model = self.model_factory()
+        return self._model
+
+    def embed_texts(self, texts: List[str]) -> np.ndarray:
+        preprocessed = self.text_normalizer.normalize_batch(texts)
+        embeddings = self.model.encode(preprocessed, batch_size=len(preprocessed), convert_to_tensor=False)
+        return normalize(embeddings)
+
+    async def _load_index(self):
+        async with self._index_lock:
+            if not self.index.is_stale(self.index_refresh_interval):
+                return
+            self._index_journal = []
+            try:
+                snapshot = self.embedding_store.current() if self.embedding_store is not None else None
+                if snapshot is None:
+                    rows = await self.profile_repo.get_active_profiles_with_embeddings()
+                    index = await asyncio.to_thread(self.index.rebuild, rows)
                 else:
-                    lemmas.append(word)
+                    rows = await self.profile_repo.get_active_profile_attributes(snapshot.built_at)
+                    index = await asyncio.to_thread(
+                        self.index.rebuild, rows, (snapshot.ids, snapshot.vectors), snapshot.projection
+                    )
+                for change in self._index_journal:
+                    change(index)
+                self.index = index
+            finally:
+                self._index_journal = None
+
+    def _update_index(self, change: Callable[[IVFVectorIndex], object]):
+        if self._index_journal is not None:
+            self._index_journal.append(change)
+        return change(self.index)
+
+    def _refresh_index(self) -> asyncio.Task:
+        if self._index_refresh_task is None or self._index_refresh_task.done():
+            self._index_refresh_task = asyncio.create_task(self._load_index())
+        return self._index_refresh_task
+
+    async def _ensure_index(self):
+        if not self.index.is_loaded:
+            await asyncio.shield(self._refresh_index())
+        elif self.index.is_stale(self.index_refresh_interval):
+            self._refresh_index()
+
+    async def _load_density_grid(self):
+        async with self._density_lock:
+            if not self.density_grid.is_stale(self.density_refresh_interval):
+                return
+            cells = await self.profile_repo.get_active_density(self.density_grid.cell_size)
+            self.density_grid.build(cells)
+
+    def _refresh_density_grid(self) -> asyncio.Task:
+        if self._density_refresh_task is None or self._density_refresh_task.done():
+            self._density_refresh_task = asyncio.create_task(self._load_density_grid())
+        return self._density_refresh_task
+
+    async def _search_radius(self, user: dict) -> float:
+        if self.density_grid is None:
+            return self.max_distance_search
 
-        return ' '.join(lemmas)
+        if not self.density_grid.is_loaded:
+            await asyncio.shield(self._refresh_density_grid())
+        elif self.density_grid.is_stale(self.density_refresh_interval):
+            self._refresh_density_grid()
+
+        genders = ['male', 'female'] if user['interesting_gender'] == 'any' else [user['interesting_gender']]
+        return self.density_grid.radius_for(user['latitude'], user['longitude'], genders)
+
+    async def sync_user_index(self, user_id: int):
+        if self.index is None:
+            return
+        if self.index_changes is not None:
+            await self.index_changes.publish(user_id)
+            return
+        await self.apply_index_change(user_id)
+
+    async def apply_index_change(self, user_id: int):
+        if self.index is None or not self.index.is_loaded:
+            return
+        user = await self.profile_repo.get_profile_by_user_id(user_id)
+        if not user or not user['is_active']:
+            self._update_index(lambda index: index.remove(user_id))
+            return
+        self._update_index(lambda index: index.upsert(user))
+
+    async def set_user_active(self, user_id: int, is_active: bool):
+        if self.index is None:
+            return
+        if self.index_changes is not None:
+            await self.index_changes.publish(user_id)
+            return
+        if not self.index.is_loaded:
+            return
+        if not self._update_index(lambda index: index.set_active(user_id, is_active)) and is_active:
+            await self.sync_user_index(user_id)
 
     async def _get_similar_profiles_by_embedding(
-        self, user_id: int, count: int = 5
+        self, ctx: CandidateContext, count: int
     ) -> List[Tuple[int, float]]:
-        user = await self.profile_repo.get_profile_by_user_id(user_id)
-        if not user or not user.get('about_embedding'):
+        user = ctx.user
+        if user.get('about_embedding') is None:
             return []
 
-        user_embedding = np.array(user['about_embedding']).reshape(1, -1)
-        min_age, max_age = get_match_age_range(user['age'])
-        users = await self.profile_repo.get_candidates_with_embeddings(
-            user_id, user, self.max_distance_search, min_age, max_age
+        if self.index is None:
+            return await self._score_candidates_by_embedding(ctx, count)
+
+        await self._ensure_index()
+        index = self.index
+        genders = ['male', 'female'] if user['interesting_gender'] == 'any' else [user['interesting_gender']]
+        excluded = {ctx.user_id, *ctx.exclude}
+        unseen = []
+        pool_size = count * self.mmr_pool_factor
+        fetch = pool_size * self.index_overfetch
+
+        while len(unseen) < pool_size:
+            found = index.search(
+                user['about_embedding'],
+                user['latitude'],
+                user['longitude'],
+                ctx.radius,
+                genders,
+                ctx.min_age,
+                ctx.max_age,
+                fetch,
+                exclude_user_ids=excluded
+            )
+            unseen.extend(await self._filter_seen(ctx.user_id, found))
+            if len(found) < fetch:
+                break
+            excluded.update(uid for uid, _ in found)
+            fetch *= 2
+
+        pool = unseen[:pool_size]
+        return self._diversify(ctx, pool, index.vectors_for([uid for uid, _ in pool]), count)
+
+    def _diversify(
+        self, ctx: CandidateContext, pool: List[Tuple[int, float]], vectors: np.ndarray, count: int
+    ) -> List[Tuple[int, float]]:
+        if len(pool) <= 1 or (self.mmr_diversity_weight <= 0 and self.mmr_distance_weight <= 0):
+            return pool[:count]
+
+        vectors = normalize(vectors)
+        relevance = vectors @ normalize(ctx.user['about_embedding'])
+        distances = np.array([dist for _, dist in pool], dtype=np.float32)
+        penalties = self.mmr_distance_weight * distances / max(ctx.radius * 1000, 1)
+        order = mmr_rerank(
+            relevance, vectors, count, penalties, self.mmr_relevance_weight, self.mmr_diversity_weight
         )
+        return [pool[i] for i in order]
 
-        if not users:
+    async def _filter_seen(self, user_id: int, candidates: List[Tuple]) -> List[Tuple]:
+        if not candidates:
             return []
+        if not await self.seen_filter.exists(user_id):
+            await self.seen_filter.rebuild(user_id, await self.swipe_repo.get_swiped_user_ids(user_id))
+        seen = await self.seen_filter.contains_many(user_id, [candidate[0] for candidate in candidates])
+        return [candidate for candidate, is_seen in zip(candidates, seen) if not is_seen]
 
-        similarities = []
-        for candidate in users:
-            cand_embedding = np.array(candidate['about_embedding']).reshape(1, -1)
-            similarity = cosine_similarity(user_embedding, cand_embedding)[0][0]
-            similarities.append((similarity, candidate))
-
-        similarities.sort(key=lambda x: x[0], reverse=True)
-        top_matches = [
-            (candidate['user_id'], candidate['dist'])
-            for _, candidate in similarities[:count]
-        ]
-        return top_matches
+    async def _boost_reciprocal(self, user_id: int, candidates: List[Tuple]) -> List[Tuple]:
+        if self.inbound_likes is None or not candidates:
+            return candidates
+        if not await self.inbound_likes.exists(user_id):
+            await self.inbound_likes.rebuild(user_id, await self.swipe_repo.get_inbound_liker_ids(user_id))
+        liked_by = await self.inbound_likes.contains_many(user_id, [candidate[0] for candidate in candidates])
+        return (
+            [c for c, liked in zip(candidates, liked_by) if liked] +
+            [c for c, liked in zip(candidates, liked_by) if not liked]
+        )
 
-    async def _get_random_profiles_by_criteria(
-            self, user_id: int, count: int = 5, rec_list: List[int] = None
+    async def _take_unseen(
+        self, user_id: int, ranked: List[Tuple[int, float]], count: int
     ) -> List[Tuple[int, float]]:
-        user = await self.profile_repo.get_profile_by_user_id(user_id)
-        if not user:
+        if count <= 0:
             return []
+        unseen = []
+        chunk = count * self.index_overfetch
+        for start in range(0, len(ranked), chunk):
+            if len(unseen) >= count:
+                break
+            unseen.extend(await self._filter_seen(user_id, ranked[start:start + chunk]))
+        return unseen[:count]
 
-        min_age, max_age = get_match_age_range(user['age'])
+    async def _score_candidates_by_embedding(
+        self, ctx: CandidateContext, count: int
+    ) -> List[Tuple[int, float]]:
+        user = ctx.user
+
+        if self.tile_loader is not None:
+            rows, distances = await self._load_tiles(ctx)
+            embedded = np.flatnonzero(rows['has_embedding'] & ~np.isin(rows['user_id'], ctx.exclude))
+            scores = rows['embedding'][embedded] @ np.asarray(user['about_embedding'], dtype=np.float32)
+            pool_size = count * self.mmr_pool_factor
+            fetch = pool_size * self.index_overfetch
+            fetched = 0
+            pool = []
+
+            while len(pool) < pool_size and fetched < scores.shape[0]:
+                order = embedded[top_k(scores, fetched + fetch)[fetched:]]
+                fetched += order.shape[0]
+                ranked = [(int(rows['user_id'][i]), float(distances[i]), i) for i in order]
+                pool.extend(await self._filter_seen(ctx.user_id, ranked))
+                fetch *= 2
 
-        candidate_ids = await self.profile_repo.get_candidates_by_criteria(
-            user_id, user, rec_list, min_age, max_age, self.max_distance_search
+            pool = pool[:pool_size]
+            vectors = rows['embedding'][[i for _, _, i in pool]]
+            return self._diversify(ctx, [(uid, dist) for uid, dist, _ in pool], vectors, count)
+
+        users = await self.profile_repo.get_candidates_with_embeddings(
+            ctx.user_id, user, ctx.radius, ctx.min_age, ctx.max_age, ctx.exclude
         )
-        if not candidate_ids:
+
+        if not users:
             return []
 
-        results = []
-        user_lat = user['latitude']
-        user_lon = user['longitude']
+        matrix = stack_embeddings(candidate['about_embedding'] for candidate in users)
+        top_indices, _ = cosine_top_k(user['about_embedding'], matrix, count * self.mmr_pool_factor)
+        pool = [(users[i]['user_id'], users[i]['dist']) for i in top_indices]
+        return self._diversify(ctx, pool, matrix[top_indices], count)
 
-        for cand_id in candidate_ids:
-            cand_profile = await self.profile_repo.get_profile_by_user_id(cand_id)
-            if cand_profile and cand_profile.get('latitude') and cand_profile.get('longitude'):
-                distance = self.calculate_distance(
-                    user_lat, user_lon,
-                    cand_profile['latitude'], cand_profile['longitude']
-                )
-                results.append((cand_id, distance))
+    async def _get_random_profiles_by_criteria(
+            self, ctx: CandidateContext, count: int
+    ) -> List[Tuple[int, float]]:
+        if self.tile_loader is not None:
+            rows, distances = await self._load_tiles(ctx)
+            eligible = np.flatnonzero(~np.isin(rows['user_id'], ctx.exclude))
+            rng = np.random.default_rng()
+            chunk = count * self.index_overfetch
+            unseen = []
+            while len(unseen) < count and eligible.size:
+                picked = rng.choice(eligible, size=min(chunk, eligible.size), replace=False)
+                eligible = np.setdiff1d(eligible, picked, assume_unique=True)
+                sample = [(int(rows['user_id'][i]), float(distances[i])) for i in picked]
+                unseen.extend(await self._filter_seen(ctx.user_id, sample))
+            return unseen[:count]
 
-        random.shuffle(results)
-        return results[:count]
+        return await self.profile_repo.sample_candidates_by_criteria(
+            ctx.user_id, ctx.user, ctx.exclude, ctx.min_age, ctx.max_age, ctx.radius, count
+        )
 
     async def update_user_embedding(self, user_id: int):
         user = await self.profile_repo.get_profile_by_user_id(user_id)
         if not user or not user.get('about'):
             return
 
-        preprocessed_about = await self._preprocess_text(user['about'])
-        embedding = self.model.encode(preprocessed_about, convert_to_tensor=False)
-        await self.profile_repo.update_embedding(user_id, embedding)
-        
-    async def get_hybrid_recommendations(
-        self, user_id: int, count: int
+        embedding = await self.embedding_batcher.submit(user_id, user['about'])
+        if self.tile_loader is not None:
+            await self.tile_loader.tile_cache.invalidate(user)
+        if self.index_changes is not None:
+            await self.index_changes.publish(user_id)
+        elif self.index is not None and self.index.is_loaded and user['is_active']:
+            row = {**user, 'about_embedding': embedding}
+            self._update_index(lambda index: index.upsert(row))
+
+    async def _get_collaborative_profiles(
+            self, ctx: CandidateContext, count: int
     ) -> List[Tuple[int, float]]:
-        already_swiped = await self.swipe_cache.get(user_id)
-
-        cached = await self.recommendation_cache.get(user_id)
-        if cached:
-            filtered = [
-                (uid, dist)
-                for uid, dist in cached
-                if uid not in already_swiped
-            ][:count]
-            return filtered
-
-        content_count = int(count * self.recsys_coeff)
-        random_count = count - content_count
-
-        content_based = await self._get_similar_profiles_by_embedding(user_id, content_count)
-        content_filtered = [
-            (uid, dist)
-            for uid, dist in content_based
-            if uid not in already_swiped
-        ]
-
-        random_based = await self._get_random_profiles_by_criteria(
-            user_id, random_count, [uid for uid, _ in content_filtered]
-        )
-        random_filtered = [
-            (uid, dist)
-            for uid, dist in random_based
-            if uid not in already_swiped
-        ]
+        model = self.collaborative.current()
+        if model is None or self.tile_loader is None:
+            return []
+        user_vector = model.user_vector(ctx.user_id)
+        if user_vector is None:
+            return []
+
+        rows, distances = await self._load_tiles(ctx)
+        scores, known = model.score(user_vector, rows['user_id'])
+        eligible = np.flatnonzero(known & (scores > 0) & ~np.isin(rows['user_id'], ctx.exclude))
+        order = eligible[top_k(scores[eligible], eligible.shape[0])]
+        ranked = [(int(rows['user_id'][i]), float(distances[i])) for i in order]
+        return await self._take_unseen(ctx.user_id, ranked, count)
+
+    async def _load_tiles(self, ctx: CandidateContext) -> Tuple[np.ndarray, np.ndarray]:
+        if ctx.tiles is None:
+            ctx.tiles = asyncio.ensure_future(
+                self.tile_loader.load(ctx.user_id, ctx.user, ctx.radius, ctx.min_age, ctx.max_age)
+            )
+        return await asyncio.shield(ctx.tiles)
+
+    @staticmethod
+    def _release_tiles(ctx: CandidateContext):
+        if ctx.tiles is None:
+            return
+        ctx.tiles.add_done_callback(lambda tiles: tiles.cancelled() or tiles.exception())
+        ctx.tiles.cancel()
+
+    async def _load_context(self, user_id: int, exclude: Iterable[int]) -> Optional[CandidateContext]:
+        user = await self.profile_repo.get_profile_by_user_id(user_id)
+        if not user:
+            return None
+
+        min_age, max_age = get_match_age_range(user['age'])
+        radius = await self._search_radius(user)
+        return CandidateContext(user_id, user, min_age, max_age, radius, list(exclude))
+
+    async def _run_source(
+        self, source: CandidateSource, ctx: CandidateContext, count: int
+    ) -> List[Tuple[int, float]]:
+        started = time.perf_counter()
+        try:
+            return await asyncio.wait_for(source.fetch(ctx, count), timeout=source.timeout)
+        except asyncio.TimeoutError:
+            RECSYS_SOURCE_SKIPPED.labels(source=source.name, reason='timeout').inc()
+            logger.warning(f"Candidate source '{source.name}' exceeded {source.timeout}s for user {ctx.user_id}")
+            return []
+        except Exception as e:
+            RECSYS_SOURCE_SKIPPED.labels(source=source.name, reason='error').inc()
+            logger.error(f"Candidate source '{source.name}' failed for user {ctx.user_id}: {e}")
+            return []
+        finally:
+            RECSYS_STAGE_SECONDS.labels(stage=f"source:{source.name}").observe(time.perf_counter() - started)
 
+    def _merge(
+        self, results: List[List[Tuple[int, float]]], count: int
+    ) -> List[Tuple[int, float]]:
         seen = set()
-        final_results = []
-        for uid, dist in content_filtered + random_filtered:
+        merged = []
+        leftovers = []
+        total_share = sum(source.share for source in self.sources) or 1
+        for source, candidates in zip(self.sources, results):
+            quota = int(count * source.share / total_share)
+            for uid, dist in candidates:
+                if uid in seen:
+                    continue
+                if quota > 0:
+                    seen.add(uid)
+                    merged.append((uid, dist))
+                    quota -= 1
+                else:
+                    leftovers.append((uid, dist))
+
+        for uid, dist in leftovers:
+            if len(merged) >= count:
+                break
             if uid not in seen:
                 seen.add(uid)
-                final_results.append((uid, dist))
-        final_results = final_results[:count]
+                merged.append((uid, dist))
+        return merged[:count]
+
+    async def _compute_recommendations(
+        self, user_id: int, count: int, exclude: Iterable[int] = ()
+    ) -> List[Tuple[int, float]]:
+        started = time.perf_counter()
+        ctx = await self._load_context(user_id, exclude)
+        RECSYS_STAGE_SECONDS.labels(stage='load_user').observe(time.perf_counter() - started)
+        if ctx is None:
+            return []
+
+        started = time.perf_counter()
+        try:
+            results = await asyncio.gather(*(self._run_source(source, ctx, count) for source in self.sources))
+        finally:
+            self._release_tiles(ctx)
+        RECSYS_STAGE_SECONDS.labels(stage='sources').observe(time.perf_counter() - started)
+
+        started = time.perf_counter()
+        merged = self._merge(results, count)
+        RECSYS_STAGE_SECONDS.labels(stage='merge').observe(time.perf_counter() - started)
+
+        started = time.perf_counter()
+        ranked = await self._boost_reciprocal(user_id, merged)
+        RECSYS_STAGE_SECONDS.labels(stage='reciprocal').observe(time.perf_counter() - started)
+        return ranked
+
+    async def refill_recommendations(self, user_id: int):
+        queued = await self.recommendation_cache.get(user_id)
+        missing = self.queue_size - len(queued)
+        if missing <= 0:
+            return
+
+        fresh = await self._compute_recommendations(user_id, missing, [uid for uid, _ in queued])
+        await self.recommendation_cache.push(user_id, fresh)
+
+    async def _fill_cold_queue_once(self, user_id: int, count: int):
+        token = await self.recommendation_cache.acquire_compute_lock(user_id)
+        if token is None:
+            await self.recommendation_cache.wait_for_compute(user_id)
+            return
+
+        try:
+            if await self.recommendation_cache.size(user_id) > 0:
+                return
+            fresh = await self._compute_recommendations(user_id, count)
+            if fresh:
+                await self.recommendation_cache.set(user_id, fresh)
+                await self.recommendation_cache.request_refill(user_id)
+        finally:
+            await self.recommendation_cache.release_compute_lock(user_id, token)
+
+    async def _fill_cold_queue(self, user_id: int, count: int):
+        task = self._cold_fills.get(user_id)
+        if task is None:
+            task = asyncio.create_task(self._fill_cold_queue_once(user_id, count))
+            self._cold_fills[user_id] = task
+            task.add_done_callback(lambda _: self._cold_fills.pop(user_id, None))
+        await asyncio.shield(task)
+
+    async def get_hybrid_recommendations(
+        self, user_id: int, count: int, after: Optional[float] = None
+    ) -> Tuple[List[Tuple[int, float]], Optional[float]]:
+        if after is not None:
+            await self.recommendation_cache.trim(user_id, after)
+        elif await self.recommendation_cache.size(user_id) == 0:
+            await self._fill_cold_queue(user_id, count)
+            if await self.recommendation_cache.size(user_id) == 0:
+                return [], None
+
+        page = []
+        cursor = after
+        while len(page) < count:
+            chunk = await self.recommendation_cache.get_page(user_id, cursor, count - len(page))
+            if not chunk:
+                break
+            cursor = chunk[-1][2]
+
+            candidates = [(uid, dist) for uid, dist, _ in chunk]
+            unseen = await self._filter_seen(user_id, candidates)
+            if len(unseen) < len(candidates):
+                unseen_ids = {uid for uid, _ in unseen}
+                await self.recommendation_cache.remove(user_id, [uid for uid, _ in candidates if uid not in unseen_ids])
+            page.extend(unseen)
 
-        if final_results:
-            await self.recommendation_cache.set(user_id, final_results)
+        if await self.recommendation_cache.count_after(user_id, cursor) < self.queue_low_watermark:
+            await self.recommendation_cache.request_refill(user_id)
 
-        return final_results
+        return await self._boost_reciprocal(user_id, page), cursor
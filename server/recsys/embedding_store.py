@@ -0,0 +1,133 @@
+import glob
+import os
+import time
+import asyncpg
+import numpy as np
+from datetime import datetime, timezone
+from typing import Optional, Tuple
+
+from recsys.scoring import fit_projection, normalize, project
+from shared.utils.embedding_codec import decode_embedding
+
+STORE_MAGIC = 0x454D4232
+HEADER_SIZE = 5
+CURRENT_FILE = "CURRENT"
+
+class EmbeddingSnapshot:
+    def __init__(self, path: str):
+        header = np.fromfile(path, dtype=np.int64, count=HEADER_SIZE)
+        if header.shape[0] != HEADER_SIZE or header[0] != STORE_MAGIC:
+            raise ValueError(f"{path} is not an embedding store file")
+
+        _, built_at_ms, n, dim, reduced_dim = (int(v) for v in header)
+        self.path = path
+        self.built_at = datetime.fromtimestamp(built_at_ms / 1000, tz=timezone.utc)
+        offset = header.nbytes
+        self.ids = np.memmap(path, dtype=np.int64, mode='r', offset=offset, shape=(n,))
+        offset += n * 8
+        self.vectors = np.memmap(path, dtype=np.float32, mode='r', offset=offset, shape=(n, dim))
+        offset += n * dim * 4
+
+        self.mean = self.components = self.reduced = None
+        if reduced_dim:
+            self.mean = np.fromfile(path, dtype=np.float32, count=dim, offset=offset)
+            offset += dim * 4
+            self.components = np.fromfile(path, dtype=np.float32, count=dim * reduced_dim, offset=offset).reshape(dim, reduced_dim)
+            offset += dim * reduced_dim * 4
+            self.reduced = np.memmap(path, dtype=np.float32, mode='r', offset=offset, shape=(n, reduced_dim))
+
+    @property
+    def projection(self) -> Optional[Tuple[np.ndarray, np.ndarray, np.ndarray]]:
+        if self.components is None:
+            return None
+        return self.mean, self.components, self.reduced
+
+def write_embedding_store(
+        directory: str,
+        ids: np.ndarray,
+        vectors: np.ndarray,
+        built_at: datetime,
+        reduced_dim: int = 0,
+        reduction_mode: str = 'pca',
+        keep: int = 2
+) -> str:
+    os.makedirs(directory, exist_ok=True)
+    order = np.argsort(ids)
+    built_at_ms = int(built_at.timestamp() * 1000)
+    mean = components = None
+    if reduced_dim and ids.shape[0]:
+        mean, components = fit_projection(vectors, reduced_dim, reduction_mode)
+    header = np.array([
+        STORE_MAGIC, built_at_ms, ids.shape[0], vectors.shape[1], components.shape[1] if components is not None else 0
+    ], dtype=np.int64)
+
+    path = os.path.join(directory, f"embeddings.{built_at_ms}.bin")
+    with open(f"{path}.tmp", 'wb') as f:
+        f.write(header.tobytes())
+        f.write(np.ascontiguousarray(ids[order], dtype=np.int64).tobytes())
+        f.write(np.ascontiguousarray(vectors[order], dtype=np.float32).tobytes())
+        if components is not None:
+            f.write(mean.tobytes())
+            f.write(components.tobytes())
+            for start in range(0, order.shape[0], 65536):
+                f.write(project(vectors[order[start:start + 65536]], mean, components).tobytes())
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(f"{path}.tmp", path)
+
+    pointer = os.path.join(directory, CURRENT_FILE)
+    with open(f"{pointer}.tmp", 'w') as f:
+        f.write(os.path.basename(path))
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(f"{pointer}.tmp", pointer)
+
+    for stale in sorted(glob.glob(os.path.join(directory, "embeddings.*.bin")))[:-keep]:
+        os.remove(stale)
+    return path
+
+async def export_embedding_store(
+        dsn: str, directory: str, dim: int = 384, reduced_dim: int = 0, reduction_mode: str = 'pca'
+) -> dict:
+    started = time.perf_counter()
+    built_at = datetime.now(timezone.utc)
+    conn = await asyncpg.connect(dsn=dsn)
+    try:
+        records = await conn.fetch("""
+            SELECT user_id, about_embedding, about_embedding_packed
+            FROM profiles
+            WHERE about_embedding_packed IS NOT NULL OR about_embedding IS NOT NULL
+        """)
+    finally:
+        await conn.close()
+
+    ids = np.fromiter((r['user_id'] for r in records), dtype=np.int64, count=len(records))
+    vectors = np.zeros((len(records), dim), dtype=np.float32)
+    for i, r in enumerate(records):
+        packed = r['about_embedding_packed']
+        vectors[i] = decode_embedding(packed) if packed is not None else np.asarray(r['about_embedding'], dtype=np.float32)
+
+    path = write_embedding_store(directory, ids, normalize(vectors), built_at, reduced_dim, reduction_mode)
+    return {'profiles': len(records), 'path': path, 'seconds': round(time.perf_counter() - started, 2)}
+
+class SharedEmbeddingStore:
+    def __init__(self, directory: str, reload_interval: float = 60):
+        self.directory = directory
+        self.reload_interval = reload_interval
+        self._snapshot: Optional[EmbeddingSnapshot] = None
+        self._checked_at = 0.0
+
+    def current(self) -> Optional[EmbeddingSnapshot]:
+        now = time.monotonic()
+        if self._checked_at and now - self._checked_at < self.reload_interval:
+            return self._snapshot
+        self._checked_at = now
+
+        try:
+            with open(os.path.join(self.directory, CURRENT_FILE)) as f:
+                path = os.path.join(self.directory, f.read().strip())
+        except FileNotFoundError:
+            return self._snapshot
+        if self._snapshot is None or self._snapshot.path != path:
+            self._snapshot = EmbeddingSnapshot(path)
+        return self._snapshot
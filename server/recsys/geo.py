@@ -0,0 +1,15 @@
+import numpy as np
+from typing import Tuple
+
+EARTH_RADIUS_M = 6371000.0
+
+def haversine_m(lat: float, lon: float, lats: np.ndarray, lons: np.ndarray) -> np.ndarray:
+    lat1, lon1 = np.radians(lat), np.radians(lon)
+    lat2, lon2 = np.radians(lats), np.radians(lons)
+    a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_M * np.arcsin(np.sqrt(np.clip(a, 0, 1)))
+
+def bounding_box(lat: float, lon: float, radius_km: float) -> Tuple[float, float, float, float]:
+    lat_delta = float(np.degrees(radius_km * 1000 / EARTH_RADIUS_M))
+    lon_delta = lat_delta / max(float(np.cos(np.radians(lat))), 1e-6)
+    return lat - lat_delta, lat + lat_delta, lon - lon_delta, lon + lon_delta
@@ -0,0 +1,35 @@
+import asyncio
+from typing import Optional
+
+from core.logger import logger
+from infrastructure.cache.redis.index_change_channel import IndexChangeChannel
+from recsys.embedding_recommender import EmbeddingRecommender
+
+class IndexSyncWorker:
+    def __init__(self, recommender: EmbeddingRecommender, channel: IndexChangeChannel):
+        self.recommender = recommender
+        self.channel = channel
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self):
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def _run(self):
+        while True:
+            try:
+                async for user_id in self.channel.listen():
+                    try:
+                        await self.recommender.apply_index_change(user_id)
+                    except Exception as e:
+                        logger.error(f"Index sync failed for user {user_id}: {e}")
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Index change subscription dropped: {e}")
+                await asyncio.sleep(1)
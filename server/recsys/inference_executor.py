@@ -0,0 +1,18 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Any, Callable, Optional
+
+class InferenceExecutor:
+    def __init__(self, max_workers: int = 1, torch_threads: Optional[int] = None):
+        self.max_workers = max_workers
+        self.torch_threads = torch_threads
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="inference")
+
+        if torch_threads:
+            import torch
+            torch.set_num_threads(torch_threads)
+
+    async def run(self, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, partial(fn, *args, **kwargs))
@@ -0,0 +1,44 @@
+import gc
+import threading
+from typing import Any, Callable, Dict, Hashable
+
+from recsys.embedding_backends import DEFAULT_MODEL_NAME, load_embedding_model
+
+_lock = threading.Lock()
+_instances: Dict[Hashable, Any] = {}
+
+def _get_or_create(key: Hashable, factory: Callable[[], Any]) -> Any:
+    instance = _instances.get(key)
+    if instance is not None:
+        return instance
+    with _lock:
+        if key not in _instances:
+            _instances[key] = factory()
+        return _instances[key]
+
+def get_embedding_model(backend: str = 'torch', model_name: str = DEFAULT_MODEL_NAME, onnx_file: str = None):
+    return _get_or_create(
+        ('embedding_model', backend, model_name, onnx_file),
+        lambda: load_embedding_model(backend, model_name, onnx_file)
+    )
+
+def get_morph_analyzer():
+    def create():
+        import pymorphy2
+        return pymorphy2.MorphAnalyzer()
+    return _get_or_create('morph_analyzer', create)
+
+def get_lemmatizer():
+    def create():
+        from nltk.stem import WordNetLemmatizer
+        lemmatizer = WordNetLemmatizer()
+        lemmatizer.lemmatize('warmup')
+        return lemmatizer
+    return _get_or_create('lemmatizer', create)
+
+def preload_models(backend: str = 'torch', model_name: str = DEFAULT_MODEL_NAME, onnx_file: str = None):
+    get_embedding_model(backend, model_name, onnx_file)
+    get_morph_analyzer()
+    get_lemmatizer()
+    gc.collect()
+    gc.freeze()
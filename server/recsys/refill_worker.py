@@ -0,0 +1,43 @@
+import asyncio
+from typing import List, Optional
+
+from core.logger import logger
+from infrastructure.cache.redis.recommendation_cache import RecommendationCache
+from recsys.embedding_recommender import EmbeddingRecommender
+
+class RecommendationRefillWorker:
+    def __init__(
+            self,
+            recommender: EmbeddingRecommender,
+            cache: RecommendationCache,
+            concurrency: int = 4
+    ):
+        self.recommender = recommender
+        self.cache = cache
+        self.concurrency = concurrency
+        self._tasks: List[asyncio.Task] = []
+
+    async def start(self):
+        self._tasks = [asyncio.create_task(self._run()) for _ in range(self.concurrency)]
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def _run(self):
+        while True:
+            user_id: Optional[int] = None
+            try:
+                user_id = await self.cache.next_refill()
+                if user_id is not None:
+                    await self.recommender.refill_recommendations(user_id)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Recommendation refill failed for user {user_id}: {e}")
+                await asyncio.sleep(1)
+            finally:
+                if user_id is not None:
+                    await self.cache.complete_refill(user_id)
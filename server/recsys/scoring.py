@@ -0,0 +1,72 @@
+import numpy as np
+from typing import Iterable, Tuple
+
+def normalize(vectors: np.ndarray) -> np.ndarray:
+    vectors = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    return np.divide(vectors, norms, out=np.zeros_like(vectors), where=norms > 0)
+
+def stack_embeddings(embeddings: Iterable) -> np.ndarray:
+    return np.ascontiguousarray(np.stack([np.asarray(e, dtype=np.float32) for e in embeddings]))
+
+def top_k(scores: np.ndarray, k: int) -> np.ndarray:
+    k = min(k, scores.shape[0])
+    if k <= 0:
+        return np.empty(0, dtype=np.int64)
+    if k < scores.shape[0]:
+        candidates = np.argpartition(-scores, k - 1)[:k]
+    else:
+        candidates = np.arange(scores.shape[0])
+    return candidates[np.argsort(-scores[candidates], kind='stable')]
+
+def cosine_top_k(query: np.ndarray, matrix: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+    scores = matrix @ np.asarray(query, dtype=np.float32)
+    indices = top_k(scores, k)
+    return indices, scores[indices]
+
+def mmr_rerank(
+        relevance: np.ndarray,
+        vectors: np.ndarray,
+        k: int,
+        penalties: np.ndarray = None,
+        relevance_weight: float = 1.0,
+        diversity_weight: float = 0.3
+) -> np.ndarray:
+    n = relevance.shape[0]
+    k = min(k, n)
+    if k <= 0:
+        return np.empty(0, dtype=np.int64)
+
+    base = relevance_weight * np.asarray(relevance, dtype=np.float32)
+    if penalties is not None:
+        base = base - penalties
+    vectors = np.asarray(vectors, dtype=np.float32)
+
+    selected = np.empty(k, dtype=np.int64)
+    available = np.ones(n, dtype=bool)
+    max_similarity = np.zeros(n, dtype=np.float32)
+    for step in range(k):
+        scores = base - diversity_weight * max_similarity if step else base
+        best = int(np.argmax(np.where(available, scores, -np.inf)))
+        selected[step] = best
+        available[best] = False
+        similarity = vectors @ vectors[best]
+        max_similarity = similarity if step == 0 else np.maximum(max_similarity, similarity)
+    return selected
+
+def fit_projection(vectors: np.ndarray, reduced_dim: int, mode: str = 'pca', sample_size: int = 20000) -> Tuple[np.ndarray, np.ndarray]:
+    vectors = np.asarray(vectors, dtype=np.float32)
+    dim = vectors.shape[1]
+    reduced_dim = min(reduced_dim, dim)
+    if mode == 'prefix':
+        return np.zeros(dim, dtype=np.float32), np.eye(dim, reduced_dim, dtype=np.float32)
+
+    rng = np.random.default_rng(0)
+    sample = vectors[rng.choice(vectors.shape[0], size=min(sample_size, vectors.shape[0]), replace=False)]
+    reduced_dim = min(reduced_dim, sample.shape[0])
+    mean = sample.mean(axis=0)
+    _, _, vt = np.linalg.svd(sample - mean, full_matrices=False)
+    return mean.astype(np.float32), np.ascontiguousarray(vt[:reduced_dim].T, dtype=np.float32)
+
+def project(vectors: np.ndarray, mean: np.ndarray, components: np.ndarray) -> np.ndarray:
+    return normalize((np.asarray(vectors, dtype=np.float32) - mean) @ components)
@@ -0,0 +1,75 @@
+import re
+from functools import lru_cache
+from typing import Iterable, List
+
+from recsys.model_registry import get_lemmatizer, get_morph_analyzer
+
+TAG_RE = re.compile(r'<[^>]+>')
+NON_WORD_RE = re.compile(r'[^a-zа-яё0-9\s]')
+CYRILLIC_RE = re.compile(r'[а-яё]')
+LATIN_RE = re.compile(r'[a-z]')
+
+class TextNormalizer:
+    def __init__(
+            self,
+            stop_words: Iterable[str] = (),
+            lemma_cache_size: int = 50000,
+            min_word_length: int = 3,
+            script_ratio: float = 0.8
+    ):
+        self.stop_words = frozenset(stop_words)
+        self.min_word_length = min_word_length
+        self.script_ratio = script_ratio
+        self._lemmatize_ru = lru_cache(maxsize=lemma_cache_size)(self._lemmatize_ru_uncached)
+        self._lemmatize_en = lru_cache(maxsize=lemma_cache_size)(self._lemmatize_en_uncached)
+
+    def detect_language(self, text: str) -> str:
+        cyrillic = len(CYRILLIC_RE.findall(text))
+        latin = len(LATIN_RE.findall(text))
+        letters = cyrillic + latin
+        if letters == 0:
+            return 'unknown'
+
+        if cyrillic / letters >= self.script_ratio:
+            return 'ru'
+        if latin / letters >= self.script_ratio:
+            return 'en'
+
+        from langdetect import detect, LangDetectException
+        try:
+            return detect(text)
+        except LangDetectException:
+            return 'unknown'
+
+    def normalize(self, text: str) -> str:
+        text = text.lower()
+        text = TAG_RE.sub('', text)
+        text = NON_WORD_RE.sub(' ', text)
+        words = text.split()
+
+        lang = self.detect_language(text)
+        if lang == 'ru':
+            lemmatize = self._lemmatize_ru
+        elif lang == 'en':
+            lemmatize = self._lemmatize_en
+        else:
+            lemmatize = None
+
+        lemmas = []
+        for word in words:
+            if word in self.stop_words or len(word) < self.min_word_length:
+                continue
+            lemmas.append(lemmatize(word) if lemmatize else word)
+
+        return ' '.join(lemmas)
+
+    def normalize_batch(self, texts: Iterable[str]) -> List[str]:
+        return [self.normalize(text) for text in texts]
+
+    @staticmethod
+    def _lemmatize_ru_uncached(word: str) -> str:
+        return get_morph_analyzer().parse(word)[0].normal_form
+
+    @staticmethod
+    def _lemmatize_en_uncached(word: str) -> str:
+        return get_lemmatizer().lemmatize(word)
@@ -0,0 +1,57 @@
+import numpy as np
+from collections import defaultdict
+from typing import List, Tuple
+
+from domain.profile.repositories.profile_repository import ProfileRepository
+from infrastructure.cache.redis.geo_tile_cache import GeoTileCache
+from recsys.geo import bounding_box, haversine_m
+
+class TileCandidateLoader:
+    def __init__(self, profile_repo: ProfileRepository, tile_cache: GeoTileCache):
+        self.profile_repo = profile_repo
+        self.tile_cache = tile_cache
+
+    async def load(
+            self, user_id: int, user: dict, max_distance_km: float, min_age: int, max_age: int
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        genders = ['male', 'female'] if user['interesting_gender'] == 'any' else [user['interesting_gender']]
+        tiles = self.tile_cache.covering_tiles(*bounding_box(user['latitude'], user['longitude'], max_distance_km))
+        entries = self.tile_cache.covering_keys(tiles, genders, min_age, max_age)
+
+        cached = await self.tile_cache.get_many([key for key, *_ in entries])
+        parts = [rows for rows in cached if rows is not None]
+        missing = [entry for entry, rows in zip(entries, cached) if rows is None]
+        if missing:
+            parts.extend(await self._fill(missing))
+
+        if not parts:
+            return np.zeros(0, dtype=self.tile_cache.dtype), np.zeros(0)
+
+        rows = np.concatenate(parts)
+        mask = (rows['user_id'] != user_id) & (rows['age'] >= min_age) & (rows['age'] <= max_age)
+        rows = rows[mask]
+        distances = haversine_m(user['latitude'], user['longitude'], rows['latitude'], rows['longitude'])
+        within = distances <= max_distance_km * 1000
+        return rows[within], distances[within]
+
+    async def _fill(self, missing: List[Tuple[str, Tuple[int, int], str, int]]) -> List[np.ndarray]:
+        bounds = [self.tile_cache.tile_bounds(tile) for _, tile, _, _ in missing]
+        ages = [self.tile_cache.bucket_bounds(bucket) for _, _, _, bucket in missing]
+        profiles = await self.profile_repo.get_tile_profiles(
+            min(b[0] for b in bounds),
+            max(b[1] for b in bounds),
+            min(b[2] for b in bounds),
+            max(b[3] for b in bounds),
+            sorted({gender for _, _, gender, _ in missing}),
+            min(a[0] for a in ages),
+            max(a[1] for a in ages)
+        )
+
+        grouped = defaultdict(list)
+        for profile in profiles:
+            tile = self.tile_cache.tile_of(profile['latitude'], profile['longitude'])
+            grouped[self.tile_cache.key(tile, profile['gender'], self.tile_cache.age_bucket(profile['age']))].append(profile)
+
+        blobs = {key: self.tile_cache.pack(grouped.get(key, [])) for key, *_ in missing}
+        await self.tile_cache.set_many(blobs)
+        return [self.tile_cache.unpack(blob) for blob in blobs.values()]
@@ -0,0 +1,375 @@
+import math
+import time
+import numpy as np
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from recsys.geo import bounding_box, haversine_m
+from recsys.scoring import normalize, project, stack_embeddings, top_k
+
+GENDER_CODES = {'male': 0, 'female': 1}
+
+class IVFVectorIndex:
+    def __init__(
+            self,
+            dim: int = 384,
+            n_lists: int = 64,
+            n_probe: int = 8,
+            exact_threshold: int = 2048,
+            train_iterations: int = 10,
+            train_sample_size: int = 20000,
+            assign_chunk_size: int = 65536,
+            rerank_size: int = 300,
+            cell_deg: float = 0.05
+    ):
+        self.dim = dim
+        self.n_lists = n_lists
+        self.n_probe = n_probe
+        self.exact_threshold = exact_threshold
+        self.train_iterations = train_iterations
+        self.train_sample_size = train_sample_size
+        self.assign_chunk_size = assign_chunk_size
+        self.rerank_size = rerank_size
+        self.cell_deg = cell_deg
+        self._lon_cells = math.ceil(360 / cell_deg)
+        self.loaded_at: Optional[float] = None
+        self._reset(0)
+
+    def _reset(
+            self,
+            capacity: int,
+            base_ids: np.ndarray = None,
+            base_vectors: np.ndarray = None,
+            projection: Tuple[np.ndarray, np.ndarray, np.ndarray] = None
+    ):
+        self._base_ids = base_ids if base_ids is not None else np.zeros(0, dtype=np.int64)
+        self._base_vectors = base_vectors
+        self._base_size = self._base_ids.shape[0]
+        capacity = max(capacity, self._base_size)
+
+        self._size = self._base_size
+        self._ids = np.zeros(capacity, dtype=np.int64)
+        self._ids[:self._base_size] = self._base_ids
+        self._vectors = np.zeros((capacity - self._base_size, self.dim), dtype=np.float32)
+        self._mean, self._components, self._base_reduced = projection or (None, None, None)
+        self._reduced = None
+        if self._components is not None:
+            self._reduced = np.zeros((capacity - self._base_size, self._components.shape[1]), dtype=np.float32)
+        self._lat = np.zeros(capacity, dtype=np.float64)
+        self._lon = np.zeros(capacity, dtype=np.float64)
+        self._gender = np.full(capacity, -1, dtype=np.int8)
+        self._age = np.zeros(capacity, dtype=np.int16)
+        self._active = np.zeros(capacity, dtype=bool)
+        self._lists = np.full(capacity, -1, dtype=np.int32)
+        self._row_by_id: Dict[int, int] = {}
+        self._centroids: Optional[np.ndarray] = None
+        self._cell_order = np.zeros(0, dtype=np.int64)
+        self._cell_keys = np.zeros(0, dtype=np.int64)
+        self._sorted_size = 0
+        self._moved: List[int] = []
+
+    def __len__(self) -> int:
+        return int(self._active[:self._size].sum())
+
+    @property
+    def is_loaded(self) -> bool:
+        return self.loaded_at is not None
+
+    def is_stale(self, max_age: float) -> bool:
+        return self.loaded_at is None or time.monotonic() - self.loaded_at > max_age
+
+    def rebuild(
+            self,
+            rows: Iterable[dict],
+            base: Tuple[np.ndarray, np.ndarray] = None,
+            projection: Tuple[np.ndarray, np.ndarray, np.ndarray] = None
+    ) -> 'IVFVectorIndex':
+        index = IVFVectorIndex(
+            self.dim, self.n_lists, self.n_probe, self.exact_threshold, self.train_iterations,
+            self.train_sample_size, self.assign_chunk_size, self.rerank_size, self.cell_deg
+        )
+        index.build(rows, base, projection)
+        return index
+
+    def build(
+            self,
+            rows: Iterable[dict],
+            base: Tuple[np.ndarray, np.ndarray] = None,
+            projection: Tuple[np.ndarray, np.ndarray, np.ndarray] = None
+    ):
+        rows = list(rows)
+        if base is None:
+            rows = [row for row in rows if row.get('about_embedding') is not None]
+            ids = np.fromiter((row['user_id'] for row in rows), dtype=np.int64, count=len(rows))
+            order = np.argsort(ids, kind='stable')
+            rows = [rows[i] for i in order]
+            vectors = normalize(stack_embeddings(row['about_embedding'] for row in rows)) if rows else (
+                np.zeros((0, self.dim), dtype=np.float32)
+            )
+            base, projection = (ids[order], vectors), None
+            changed = []
+        else:
+            changed = [row for row in rows if row.get('about_embedding') is not None]
+            rows = [row for row in rows if row.get('about_embedding') is None]
+
+        base_ids, base_vectors = base
+        self._reset(base_ids.shape[0] + max(len(changed) * 2, 1024), base_ids, base_vectors, projection)
+        ids = np.fromiter((row['user_id'] for row in rows), dtype=np.int64, count=len(rows))
+        positions = np.searchsorted(base_ids, ids)
+        found = positions < self._base_size
+        found[found] = base_ids[positions[found]] == ids[found]
+        self._set_attributes_bulk(positions[found], [row for row, hit in zip(rows, found) if hit])
+        for row in changed:
+            self._insert(row)
+
+        self._index_cells()
+        self._train()
+        self.loaded_at = time.monotonic()
+
+    def upsert(self, row: dict):
+        if row.get('about_embedding') is None:
+            self.remove(row['user_id'])
+            return
+        self._insert(row)
+        if self._centroids is None and self._size >= self.exact_threshold:
+            self._train()
+        elif self._centroids is not None:
+            idx = self._row_of(row['user_id'])
+            self._lists[idx] = self._nearest_lists(self._vectors_at(np.array([idx]))[0], 1)[0]
+
+    def set_active(self, user_id: int, is_active: bool) -> bool:
+        idx = self._row_of(user_id)
+        if idx is None:
+            return False
+        self._active[idx] = is_active
+        return True
+
+    def remove(self, user_id: int):
+        self.set_active(user_id, False)
+
+    def vectors_for(self, user_ids: Sequence[int]) -> np.ndarray:
+        return self._vectors_at(np.array([self._row_of(user_id) for user_id in user_ids], dtype=np.int64))
+
+    def search(
+            self,
+            query: Sequence[float],
+            latitude: float,
+            longitude: float,
+            max_distance_km: float,
+            genders: List[str],
+            min_age: int,
+            max_age: int,
+            k: int,
+            exclude_user_ids: Iterable[int] = ()
+    ) -> List[Tuple[int, float]]:
+        if self._size == 0 or k <= 0:
+            return []
+
+        query = normalize(query)
+        eligible, distances = self._prefilter(
+            latitude, longitude, max_distance_km, genders, min_age, max_age, exclude_user_ids
+        )
+        if eligible.size == 0:
+            return []
+
+        rows = eligible
+        if self._centroids is not None and eligible.size > self.exact_threshold:
+            probed = self._nearest_lists(query, self.n_probe)
+            in_probed = np.isin(self._lists[eligible], probed)
+            if in_probed.sum() >= k:
+                rows = eligible[in_probed]
+                distances = distances[in_probed]
+
+        if self._components is not None and rows.size > max(self.rerank_size, k):
+            coarse = self._reduced_at(rows) @ project(query, self._mean, self._components)
+            keep = top_k(coarse, max(self.rerank_size, k))
+            rows = rows[keep]
+            distances = distances[keep]
+
+        scores = self._vectors_at(rows) @ query
+        order = top_k(scores, k)
+        return [(int(self._ids[rows[i]]), float(distances[i])) for i in order]
+
+    def _row_of(self, user_id: int) -> Optional[int]:
+        idx = self._row_by_id.get(user_id)
+        if idx is not None or self._base_size == 0:
+            return idx
+        pos = int(np.searchsorted(self._base_ids, user_id))
+        if pos < self._base_size and self._base_ids[pos] == user_id:
+            return pos
+        return None
+
+    def _vectors_at(self, rows: np.ndarray) -> np.ndarray:
+        if self._base_size == 0:
+            return self._vectors[rows]
+        in_base = rows < self._base_size
+        if in_base.all():
+            return np.asarray(self._base_vectors[rows])
+        vectors = np.empty((rows.shape[0], self.dim), dtype=np.float32)
+        vectors[in_base] = self._base_vectors[rows[in_base]]
+        vectors[~in_base] = self._vectors[rows[~in_base] - self._base_size]
+        return vectors
+
+    def _reduced_at(self, rows: np.ndarray) -> np.ndarray:
+        in_base = rows < self._base_size
+        if in_base.all():
+            return np.asarray(self._base_reduced[rows])
+        reduced = np.empty((rows.shape[0], self._components.shape[1]), dtype=np.float32)
+        reduced[in_base] = self._base_reduced[rows[in_base]]
+        reduced[~in_base] = self._reduced[rows[~in_base] - self._base_size]
+        return reduced
+
+    def _insert(self, row: dict):
+        user_id = row['user_id']
+        vector = normalize(row['about_embedding'])
+        idx = self._row_of(user_id)
+
+        if idx is not None and idx < self._base_size:
+            if np.allclose(self._base_vectors[idx], vector, atol=1e-6):
+                self._set_attributes(idx, row)
+                return
+            self._active[idx] = False
+            idx = None
+
+        if idx is None:
+            idx = self._size
+            if idx == self._ids.shape[0]:
+                self._grow()
+            self._row_by_id[user_id] = idx
+            self._size += 1
+
+        self._ids[idx] = user_id
+        self._vectors[idx - self._base_size] = vector
+        if self._components is not None:
+            self._reduced[idx - self._base_size] = project(vector, self._mean, self._components)
+        self._set_attributes(idx, row)
+
+    def _set_attributes(self, idx: int, row: dict):
+        if idx < self._sorted_size and (self._lat[idx] != row['latitude'] or self._lon[idx] != row['longitude']):
+            self._moved.append(idx)
+        self._lat[idx] = row['latitude']
+        self._lon[idx] = row['longitude']
+        self._gender[idx] = GENDER_CODES.get(row['gender'], -1)
+        self._age[idx] = row['age'] or 0
+        self._active[idx] = row.get('is_active', True)
+
+    def _set_attributes_bulk(self, rows: np.ndarray, attributes: List[dict]):
+        n = len(attributes)
+        self._lat[rows] = np.fromiter((a['latitude'] for a in attributes), dtype=np.float64, count=n)
+        self._lon[rows] = np.fromiter((a['longitude'] for a in attributes), dtype=np.float64, count=n)
+        self._gender[rows] = np.fromiter((GENDER_CODES.get(a['gender'], -1) for a in attributes), dtype=np.int8, count=n)
+        self._age[rows] = np.fromiter((a['age'] or 0 for a in attributes), dtype=np.int16, count=n)
+        self._active[rows] = np.fromiter((a.get('is_active', True) for a in attributes), dtype=bool, count=n)
+
+    def _cell_key(self, lat_cells: np.ndarray, lon_cells: np.ndarray) -> np.ndarray:
+        return lat_cells * self._lon_cells + lon_cells % self._lon_cells
+
+    def _index_cells(self):
+        n = self._size
+        lat_cells = np.floor((self._lat[:n] + 90) / self.cell_deg).astype(np.int64)
+        lon_cells = np.floor((self._lon[:n] + 180) / self.cell_deg).astype(np.int64)
+        keys = self._cell_key(lat_cells, lon_cells)
+        self._cell_order = np.argsort(keys, kind='stable')
+        self._cell_keys = keys[self._cell_order]
+        self._sorted_size = n
+        self._moved = []
+
+    def _nearby_rows(self, lat_min: float, lat_max: float, lon_min: float, lon_max: float) -> np.ndarray:
+        first_lat = math.floor((max(lat_min, -90) + 90) / self.cell_deg)
+        last_lat = math.floor((min(lat_max, 90) + 90) / self.cell_deg)
+        first_lon = math.floor((lon_min + 180) / self.cell_deg)
+        last_lon = math.floor((lon_max + 180) / self.cell_deg)
+        if last_lon - first_lon + 1 >= self._lon_cells:
+            lon_ranges = [(0, self._lon_cells - 1)]
+        else:
+            first_lon %= self._lon_cells
+            last_lon %= self._lon_cells
+            lon_ranges = [(first_lon, last_lon)] if first_lon <= last_lon else [
+                (first_lon, self._lon_cells - 1), (0, last_lon)
+            ]
+
+        lat_cells = np.arange(first_lat, last_lat + 1, dtype=np.int64)
+        lows = np.concatenate([lat_cells * self._lon_cells + lo for lo, _ in lon_ranges])
+        highs = np.concatenate([lat_cells * self._lon_cells + hi + 1 for _, hi in lon_ranges])
+        starts = np.searchsorted(self._cell_keys, lows)
+        ends = np.searchsorted(self._cell_keys, highs)
+
+        parts = [self._cell_order[start:end] for start, end in zip(starts, ends) if end > start]
+        parts.append(np.arange(self._sorted_size, self._size, dtype=np.int64))
+        if self._moved:
+            parts.append(np.array(self._moved, dtype=np.int64))
+            return np.unique(np.concatenate(parts))
+        return np.concatenate(parts)
+
+    def _grow(self):
+        capacity = max(self._ids.shape[0] * 2, 1024)
+        extra = capacity - self._ids.shape[0]
+        self._ids = np.concatenate([self._ids, np.zeros(extra, dtype=np.int64)])
+        self._vectors = np.vstack([self._vectors, np.zeros((extra, self.dim), dtype=np.float32)])
+        if self._reduced is not None:
+            self._reduced = np.vstack([self._reduced, np.zeros((extra, self._reduced.shape[1]), dtype=np.float32)])
+        self._lat = np.concatenate([self._lat, np.zeros(extra, dtype=np.float64)])
+        self._lon = np.concatenate([self._lon, np.zeros(extra, dtype=np.float64)])
+        self._gender = np.concatenate([self._gender, np.full(extra, -1, dtype=np.int8)])
+        self._age = np.concatenate([self._age, np.zeros(extra, dtype=np.int16)])
+        self._active = np.concatenate([self._active, np.zeros(extra, dtype=bool)])
+        self._lists = np.concatenate([self._lists, np.full(extra, -1, dtype=np.int32)])
+
+    def _prefilter(
+            self,
+            latitude: float,
+            longitude: float,
+            max_distance_km: float,
+            genders: List[str],
+            min_age: int,
+            max_age: int,
+            exclude_user_ids: Iterable[int]
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        lat_min, lat_max, lon_min, lon_max = bounding_box(latitude, longitude, max_distance_km)
+        lon_delta = (lon_max - lon_min) / 2
+        gender_codes = [GENDER_CODES[g] for g in genders if g in GENDER_CODES]
+
+        rows = self._nearby_rows(lat_min, lat_max, lon_min, lon_max)
+        gender = self._gender[rows]
+        mask = self._active[rows] & np.logical_or.reduce([gender == code for code in gender_codes] or [False])
+        rows = rows[mask]
+        lat, lon, age = self._lat[rows], self._lon[rows], self._age[rows]
+        mask = (age >= min_age) & (age <= max_age)
+        mask &= (lat >= lat_min) & (lat <= lat_max)
+        mask &= np.abs(((lon - longitude + 180) % 360) - 180) <= lon_delta
+        rows = rows[mask]
+        exclude = np.fromiter(exclude_user_ids, dtype=np.int64)
+        if exclude.size:
+            rows = rows[~np.isin(self._ids[rows], exclude)]
+
+        distances = haversine_m(latitude, longitude, self._lat[rows], self._lon[rows])
+        within = distances <= max_distance_km * 1000
+        return rows[within], distances[within]
+
+    def _train(self):
+        n = self._size
+        if n < self.exact_threshold:
+            self._centroids = None
+            self._lists[:n] = -1
+            return
+
+        rng = np.random.default_rng()
+        n_lists = min(self.n_lists, n)
+        sample = self._vectors_at(np.sort(rng.choice(n, size=min(n, self.train_sample_size), replace=False)))
+        centroids = sample[rng.choice(sample.shape[0], size=n_lists, replace=False)].copy()
+
+        for _ in range(self.train_iterations):
+            assignments = np.argmax(sample @ centroids.T, axis=1)
+            for c in range(n_lists):
+                members = sample[assignments == c]
+                if members.shape[0]:
+                    centroids[c] = normalize(members.mean(axis=0))
+
+        self._centroids = centroids
+        for start in range(0, n, self.assign_chunk_size):
+            rows = np.arange(start, min(start + self.assign_chunk_size, n))
+            self._lists[rows] = np.argmax(self._vectors_at(rows) @ centroids.T, axis=1)
+
+    def _nearest_lists(self, vector: np.ndarray, count: int) -> np.ndarray:
+        scores = self._centroids @ vector
+        count = min(count, scores.shape[0])
+        return np.argpartition(-scores, count - 1)[:count]
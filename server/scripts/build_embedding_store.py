@@ -0,0 +1,21 @@
+import argparse
+import asyncio
+
+from core.config import get_settings
+from recsys.embedding_store import export_embedding_store
+
+def main():
+    settings = get_settings()
+    parser = argparse.ArgumentParser(description="Export profile embeddings into the shared memory-mapped store")
+    parser.add_argument("--directory", default=settings.RECSYS_EMBEDDING_STORE_DIR)
+    parser.add_argument("--reduced-dim", type=int, default=settings.RECSYS_REDUCED_DIM, help="0 disables the reduced first pass")
+    parser.add_argument("--reduction-mode", choices=["pca", "prefix"], default=settings.RECSYS_REDUCTION_MODE)
+    args = parser.parse_args()
+
+    stats = asyncio.run(export_embedding_store(
+        settings.postgres_dsn, args.directory, reduced_dim=args.reduced_dim, reduction_mode=args.reduction_mode
+    ))
+    print(f"Wrote {stats['profiles']} embeddings to {stats['path']} in {stats['seconds']}s")
+
+if __name__ == "__main__":
+    main()
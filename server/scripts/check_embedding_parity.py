@@ -0,0 +1,58 @@
+import argparse
+import asyncio
+import resource
+import sys
+import time
+import asyncpg
+import numpy as np
+
+from core.config import get_settings
+from domain.profile.repositories.profile_repository import ProfileRepository
+from recsys.embedding_backends import EMBEDDING_BACKENDS
+from recsys.model_registry import get_embedding_model
+from recsys.scoring import normalize, stack_embeddings
+from recsys.text_normalizer import TextNormalizer
+
+async def check_parity(backend: str, onnx_file: str, sample_size: int, min_similarity: float) -> bool:
+    settings = get_settings()
+    pool = await asyncpg.create_pool(dsn=settings.postgres_dsn, min_size=1, max_size=2)
+
+    try:
+        repo = ProfileRepository(pool, embedding_storage=settings.EMBEDDING_STORAGE)
+        rows = await repo.sample_profiles_with_embeddings(sample_size)
+    finally:
+        await pool.close()
+
+    if not rows:
+        print("No profiles with embeddings to compare against")
+        return True
+
+    model = get_embedding_model(backend, settings.EMBEDDING_MODEL_NAME, onnx_file)
+    texts = TextNormalizer().normalize_batch([row['about'] for row in rows])
+    started = time.perf_counter()
+    candidate = normalize(model.encode(texts, batch_size=len(texts), convert_to_tensor=False))
+    elapsed = time.perf_counter() - started
+
+    reference = normalize(stack_embeddings(row['about_embedding'] for row in rows))
+    similarities = np.sum(reference * candidate, axis=1)
+    max_rss_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+    print(f"backend={backend} samples={len(rows)}")
+    print(f"cosine mean={similarities.mean():.5f} p1={np.percentile(similarities, 1):.5f} min={similarities.min():.5f}")
+    print(f"encode {elapsed * 1000 / len(rows):.2f} ms/text, max RSS {max_rss_mb:.0f} MB")
+
+    return bool(similarities.min() >= min_similarity)
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare an embedding backend against the stored profile embeddings")
+    parser.add_argument("--backend", choices=EMBEDDING_BACKENDS, default="onnx-int8")
+    parser.add_argument("--onnx-file", default=None)
+    parser.add_argument("--sample-size", type=int, default=500)
+    parser.add_argument("--min-similarity", type=float, default=0.98)
+    args = parser.parse_args()
+
+    ok = asyncio.run(check_parity(args.backend, args.onnx_file, args.sample_size, args.min_similarity))
+    sys.exit(0 if ok else 1)
+
+if __name__ == "__main__":
+    main()
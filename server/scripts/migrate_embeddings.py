@@ -0,0 +1,58 @@
+import argparse
+import asyncio
+import asyncpg
+import numpy as np
+
+from core.config import get_settings
+from shared.utils.embedding_codec import encode_embedding
+
+async def migrate(mode: str, batch_size: int, keep_array: bool):
+    settings = get_settings()
+    conn = await asyncpg.connect(dsn=settings.postgres_dsn)
+    migrated = 0
+    last_id = 0
+
+    try:
+        await conn.execute("ALTER TABLE profiles ADD COLUMN IF NOT EXISTS about_embedding_packed BYTEA")
+        await conn.execute("ALTER TABLE profiles ADD COLUMN IF NOT EXISTS about_embedding_updated_at TIMESTAMPTZ")
+
+        while True:
+            rows = await conn.fetch("""
+                SELECT id, user_id, about_embedding
+                FROM profiles
+                WHERE id > $1
+                AND about_embedding IS NOT NULL
+                ORDER BY id
+                LIMIT $2
+            """, last_id, batch_size)
+            if not rows:
+                break
+
+            packed = [
+                (row['user_id'], encode_embedding(np.asarray(row['about_embedding'], dtype=np.float32), mode))
+                for row in rows
+            ]
+            await conn.executemany(f"""
+                UPDATE profiles
+                SET about_embedding_packed = $2,
+                    about_embedding_updated_at = now()
+                    {'' if keep_array else ', about_embedding = NULL'}
+                WHERE user_id = $1
+            """, packed)
+
+            last_id = rows[-1]['id']
+            migrated += len(rows)
+            print(f"Migrated {migrated} embeddings")
+    finally:
+        await conn.close()
+
+def main():
+    parser = argparse.ArgumentParser(description="Pack profiles.about_embedding into about_embedding_packed")
+    parser.add_argument("--mode", choices=["float32", "int8"], default="float32")
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument("--keep-array", action="store_true", help="Do not clear the legacy DOUBLE PRECISION[] column")
+    args = parser.parse_args()
+    asyncio.run(migrate(args.mode, args.batch_size, args.keep_array))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,22 @@
+import argparse
+
+from core.config import get_settings
+from recsys.bulk_precompute import run
+
+def main():
+    settings = get_settings()
+    parser = argparse.ArgumentParser(description="Precompute recommendation queues for all active profiles")
+    parser.add_argument("--workers", type=int, default=settings.RECSYS_PRECOMPUTE_WORKERS)
+    parser.add_argument("--block-size", type=int, default=settings.RECSYS_PRECOMPUTE_BLOCK_SIZE)
+    parser.add_argument("--top-n", type=int, default=settings.RECSYS_QUEUE_SIZE)
+    args = parser.parse_args()
+
+    stats = run(settings, args.workers, args.block_size, args.top_n)
+    print(
+        f"Precomputed {stats['users_with_recs']}/{stats['users']} users in {stats['partitions']} partitions "
+        f"(export {stats['export_seconds']}s, compute {stats['compute_seconds']}s, load {stats['load_seconds']}s) "
+        f"- {stats['users_per_second']} users/sec"
+    )
+
+if __name__ == "__main__":
+    main()
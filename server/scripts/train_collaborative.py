@@ -0,0 +1,20 @@
+import argparse
+import asyncio
+
+from core.config import get_settings
+from recsys.collaborative_trainer import train_collaborative
+
+def main():
+    settings = get_settings()
+    parser = argparse.ArgumentParser(description="Train collaborative-filtering factors from the swipes table")
+    parser.add_argument("--output", default=settings.RECSYS_CF_FACTORS_PATH)
+    parser.add_argument("--dim", type=int, default=settings.RECSYS_CF_DIM)
+    parser.add_argument("--epochs", type=int, default=settings.RECSYS_CF_EPOCHS)
+    parser.add_argument("--reg", type=float, default=settings.RECSYS_CF_REG)
+    args = parser.parse_args()
+
+    stats = asyncio.run(train_collaborative(settings.postgres_dsn, args.output, args.dim, args.epochs, args.reg))
+    print(f"Trained {stats['users']} users x {stats['items']} candidates from {stats['swipes']} swipes in {stats['seconds']}s")
+
+if __name__ == "__main__":
+    main()
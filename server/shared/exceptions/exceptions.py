@@ -12,3 +12,11 @@ class NotFoundException(AppException):
 class TokenException(AppException):
     def __init__(self, message="Token is missing or invalid", details=None):
         super().__init__(message, 401, details)
+
+class ServiceUnavailableException(AppException):
+    def __init__(self, message="Service is temporarily overloaded", details=None):
+        super().__init__(message, 503, details)
+
+class InvalidCursorException(AppException):
+    def __init__(self, message="Cursor is invalid", details=None):
+        super().__init__(message, 400, details)
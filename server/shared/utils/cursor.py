@@ -0,0 +1,20 @@
+import base64
+import binascii
+
+from shared.exceptions.exceptions import InvalidCursorException
+
+CURSOR_PREFIX = "recs:"
+
+def encode_cursor(score: float) -> str:
+    raw = f"{CURSOR_PREFIX}{int(score)}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+def decode_cursor(cursor: str) -> float:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+    except (binascii.Error, UnicodeDecodeError):
+        raise InvalidCursorException()
+
+    if not raw.startswith(CURSOR_PREFIX) or not raw[len(CURSOR_PREFIX):].isdigit():
+        raise InvalidCursorException()
+    return float(raw[len(CURSOR_PREFIX):])
@@ -0,0 +1,34 @@
+import numpy as np
+from typing import Optional
+
+FLOAT32_TAG = b'f'
+INT8_TAG = b'q'
+SCALE_DTYPE = np.dtype('<f4')
+
+def encode_embedding(embedding: np.ndarray, mode: str = 'float32') -> bytes:
+    embedding = np.asarray(embedding, dtype=np.float32)
+
+    if mode == 'float32':
+        return FLOAT32_TAG + embedding.astype('<f4').tobytes()
+
+    if mode == 'int8':
+        max_abs = float(np.abs(embedding).max()) if embedding.size else 0.0
+        scale = max_abs / 127 if max_abs > 0 else 1.0
+        quantized = np.clip(np.rint(embedding / scale), -127, 127).astype(np.int8)
+        return INT8_TAG + np.array([scale], dtype=SCALE_DTYPE).tobytes() + quantized.tobytes()
+
+    raise ValueError(f"Unknown embedding storage mode: {mode}")
+
+def decode_embedding(blob: Optional[bytes]) -> Optional[np.ndarray]:
+    if not blob:
+        return None
+
+    tag = blob[:1]
+    if tag == FLOAT32_TAG:
+        return np.frombuffer(blob, dtype='<f4', offset=1)
+
+    if tag == INT8_TAG:
+        scale = np.frombuffer(blob, dtype=SCALE_DTYPE, count=1, offset=1)[0]
+        return np.frombuffer(blob, dtype=np.int8, offset=1 + SCALE_DTYPE.itemsize).astype(np.float32) * scale
+
+    raise ValueError(f"Unknown embedding encoding tag: {tag!r}")
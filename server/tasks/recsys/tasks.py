@@ -0,0 +1,54 @@
+import asyncio
+import os
+import subprocess
+import sys
+
+from infrastructure.messaging.celery.celery_app import celery_app
+from recsys.collaborative_trainer import train_collaborative
+from recsys.embedding_store import export_embedding_store
+from core.config import get_settings
+
+settings = get_settings()
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+@celery_app.task(
+    name="recsys.train_collaborative",
+    queue='recsys',
+    routing_key='recsys.train'
+)
+def train_collaborative_factors():
+    return asyncio.run(train_collaborative(
+        settings.postgres_dsn,
+        settings.RECSYS_CF_FACTORS_PATH,
+        settings.RECSYS_CF_DIM,
+        settings.RECSYS_CF_EPOCHS,
+        settings.RECSYS_CF_REG
+    ))
+
+@celery_app.task(
+    name="recsys.build_embedding_store",
+    queue='recsys',
+    routing_key='recsys.embeddings'
+)
+def build_embedding_store():
+    return asyncio.run(export_embedding_store(
+        settings.postgres_dsn,
+        settings.RECSYS_EMBEDDING_STORE_DIR,
+        reduced_dim=settings.RECSYS_REDUCED_DIM,
+        reduction_mode=settings.RECSYS_REDUCTION_MODE
+    ))
+
+@celery_app.task(
+    name="recsys.precompute_recommendations",
+    queue='recsys',
+    routing_key='recsys.precompute'
+)
+def precompute_recommendations():
+    # Celery prefork children are daemonic and cannot own a process pool, so the job runs as its own process.
+    subprocess.run(
+        [sys.executable, os.path.join(PROJECT_ROOT, "scripts", "precompute_recommendations.py")],
+        cwd=PROJECT_ROOT,
+        env={**os.environ, "PYTHONPATH": PROJECT_ROOT},
+        check=True
+    )
@@ -0,0 +1,26 @@
+import numpy as np
+import pytest
+from datetime import datetime, timezone
+
+pytest.importorskip("asyncpg")
+
+from recsys.embedding_store import EmbeddingSnapshot, write_embedding_store
+from recsys.scoring import fit_projection, normalize
+
+
+def test_fit_projection_clamps_to_sample_count():
+    vectors = normalize(np.random.default_rng(0).standard_normal((50, 384)).astype(np.float32))
+    mean, components = fit_projection(vectors, 96)
+    assert mean.shape == (384,)
+    assert components.shape == (384, 50)
+
+
+def test_small_corpus_store_round_trips(tmp_path):
+    ids = np.arange(50, dtype=np.int64)
+    vectors = normalize(np.random.default_rng(0).standard_normal((50, 384)).astype(np.float32))
+    path = write_embedding_store(str(tmp_path), ids, vectors, datetime.now(timezone.utc), reduced_dim=96)
+
+    snapshot = EmbeddingSnapshot(path)
+    assert snapshot.components.shape == (384, 50)
+    assert snapshot.reduced.shape == (50, 50)
+    np.testing.assert_allclose(snapshot.vectors, vectors, rtol=1e-6)
@@ -0,0 +1,35 @@
+import asyncio
+import pytest
+
+fakeredis = pytest.importorskip("fakeredis")
+
+from infrastructure.cache.redis.recommendation_cache import RecommendationCache, get_holders_key
+
+
+def make_cache(**kwargs) -> RecommendationCache:
+    return RecommendationCache(fakeredis.FakeAsyncRedis(decode_responses=True), **kwargs)
+
+
+def test_evict_after_owner_queue_was_refreshed():
+    async def scenario():
+        cache = make_cache(ttl=60)
+        await cache.push(1, [(10, 100.0)])
+        await cache.redis.pexpire(get_holders_key(10), 50)
+
+        await cache.push(1, [(11, 200.0)])
+        await asyncio.sleep(0.1)
+        await cache.evict_candidate(10)
+
+        return await cache.get(1)
+
+    assert asyncio.run(scenario()) == [(11, 200.0)]
+
+
+def test_push_does_not_shorten_holders_ttl_of_other_owners():
+    async def scenario():
+        cache = make_cache(ttl=60, holders_ttl=3600)
+        await cache.bulk_set({1: [(10, 100.0)]})
+        await cache.push(2, [(10, 50.0)])
+        return await cache.redis.ttl(get_holders_key(10))
+
+    assert asyncio.run(scenario()) > 60